@@ -1,36 +1,18 @@
 import os
-import requests
+import html
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from dotenv import load_dotenv
+from user_logger import user_store, ban_user, unban_user, is_banned
+from membership import get_probe_stats
+from names import name_resolver
+from broadcast import broadcaster
+from processor import update_processor
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 BOT_OWNER_ID = "7298989448"
 
-LOGS_DIR = "logs"
-USERS_FILE = os.path.join(LOGS_DIR, "users.txt")
-BLOCKED_FILE = os.path.join(LOGS_DIR, "blocked.txt")
-
-os.makedirs(LOGS_DIR, exist_ok=True)
-for f in [USERS_FILE, BLOCKED_FILE]:
-    if not os.path.exists(f):
-        open(f, "a").close()
-
-def fetch_user_name(user_id):
-    try:
-        url = f"https://api.telegram.org/bot{BOT_TOKEN}/getChat?chat_id={user_id}"
-        response = requests.get(url).json()
-        if response.get("ok"):
-            user = response["result"]
-            if user.get("username"):
-                return f"@{user['username']}"
-            name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-            return name or f"User {user_id}"
-    except:
-        pass
-    return f"User {user_id}"
-
 async def admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if str(update.effective_user.id) != BOT_OWNER_ID:
         return
@@ -39,12 +21,61 @@ async def admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("🚫 View Blocked Users", callback_data="show_blocked")],
         [InlineKeyboardButton("✅ View Unblocked Users", callback_data="show_unblocked")]
     ]
+    if broadcaster.running:
+        buttons.append([InlineKeyboardButton("⏹ Stop Broadcast", callback_data="broadcast:stop")])
+    else:
+        buttons.append([InlineKeyboardButton("📣 Broadcast", callback_data="broadcast:help")])
+    stats = get_probe_stats()
+    load = update_processor.stats()
     await update.message.reply_text(
-        "👑 <b>Admin Panel</b>",
+        "👑 <b>Admin Panel</b>\n\n"
+        f"📡 Join checks: {stats['probes']} | avg {stats['avg_ms']} ms | max {stats['max_ms']:.0f} ms\n"
+        f"⏱ Timeouts: {stats['timeouts']} | ❗ Errors: {stats['errors']} | 🔌 Breaker: {stats['breaker']}\n"
+        f"⚙️ Updates: running {load['running']}/{load['concurrency']} | waiting {load['waiting']} "
+        f"(peak {load['peak_waiting']}) | queued {load['queued']} | dropped {load['dropped']} | done {load['processed']}\n\n"
+        + broadcaster.status_line(),
         parse_mode="HTML",
         reply_markup=InlineKeyboardMarkup(buttons)
     )
 
+# ✅ Paged admin lists: view → header
+PAGE_SIZE = 20
+NAME_LOOKUP_CONCURRENCY = 10
+LIST_VIEWS = {
+    "users": "👥 <b>Total Users: {total}</b>",
+    "blocked": "🚫 <b>Blocked Users: {total}</b>",
+    "unblocked": "✅ <b>Unblocked Users: {total}</b>",
+}
+
+# Only one page of ids is read and only those names are looked up, so a page
+# costs the same with 100 or 100k users.
+async def show_user_list(query, view, page):
+    total = user_store.count(view)
+    pages = max(1, (total - 1) // PAGE_SIZE + 1)
+    page = min(max(page, 1), pages)
+    offset = (page - 1) * PAGE_SIZE
+
+    uids = [str(uid) for uid in user_store.page(offset, PAGE_SIZE, view)]
+    names = await name_resolver.resolve_many(uids, NAME_LOOKUP_CONCURRENCY, prefer_username=True)
+
+    msg = LIST_VIEWS[view].format(total=total) + f" — page {page}/{pages}\n\n"
+    buttons = []
+    for i, (uid, name) in enumerate(zip(uids, names), offset + 1):
+        is_blocked = view == "blocked" or (view == "users" and is_banned(uid))
+        action = "unblock" if is_blocked else "block"
+        msg += f"{i}. {html.escape(name)} ({uid})\n"
+        buttons.append([InlineKeyboardButton(f"{action.title()} #{i}", callback_data=f"toggle:{uid}:{action}")])
+
+    nav = []
+    if page > 1:
+        nav.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"show_{view}:{page - 1}"))
+    if page < pages:
+        nav.append(InlineKeyboardButton("Next ➡️", callback_data=f"show_{view}:{page + 1}"))
+    if nav:
+        buttons.append(nav)
+
+    await query.edit_message_text(msg, parse_mode="HTML", reply_markup=InlineKeyboardMarkup(buttons))
+
 async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
@@ -53,62 +84,46 @@ async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TY
 
     data = query.data
 
-    with open(USERS_FILE, "r") as f:
-        users = list(set(f.read().splitlines()))
-    with open(BLOCKED_FILE, "r") as f:
-        blocked = set(f.read().splitlines())
-
-    if data == "show_users":
-        msg = f"👥 <b>Total Users: {len(users)}</b>\n\n"
-        buttons = []
-        for i, uid in enumerate(users, 1):
-            name = fetch_user_name(uid)
-            is_blocked = uid in blocked
-            label = f"{i}. {name} ({uid})"
-            action = "Unblock" if is_blocked else "Block"
-            callback = f"toggle:{uid}:{'unblock' if is_blocked else 'block'}"
-            buttons.append([InlineKeyboardButton(action, callback_data=callback)])
-            msg += f"{label}\n"
-        await query.edit_message_text(msg, parse_mode="HTML", reply_markup=InlineKeyboardMarkup(buttons))
-
-    elif data == "show_blocked":
-        msg = f"🚫 <b>Blocked Users: {len(blocked)}</b>\n\n"
-        buttons = []
-        for i, uid in enumerate(blocked, 1):
-            name = fetch_user_name(uid)
-            label = f"{i}. {name} ({uid})"
-            callback = f"toggle:{uid}:unblock"
-            buttons.append([InlineKeyboardButton("Unblock", callback_data=callback)])
-            msg += f"{label}\n"
-        await query.edit_message_text(msg, parse_mode="HTML", reply_markup=InlineKeyboardMarkup(buttons))
-
-    elif data == "show_unblocked":
-        unblocked = [uid for uid in users if uid not in blocked]
-        msg = f"✅ <b>Unblocked Users: {len(unblocked)}</b>\n\n"
-        buttons = []
-        for i, uid in enumerate(unblocked, 1):
-            name = fetch_user_name(uid)
-            label = f"{i}. {name} ({uid})"
-            callback = f"toggle:{uid}:block"
-            buttons.append([InlineKeyboardButton("Block", callback_data=callback)])
-            msg += f"{label}\n"
-        await query.edit_message_text(msg, parse_mode="HTML", reply_markup=InlineKeyboardMarkup(buttons))
+    if data.startswith("show_"):
+        view, _, page = data[len("show_"):].partition(":")
+        if view in LIST_VIEWS:
+            await show_user_list(query, view, int(page or 1))
+
+    elif data == "broadcast:help":
+        await query.edit_message_text(
+            "📣 Send the announcement to this chat, then reply to it with /broadcast.\n"
+            "It is copied to every user (text, photo, buttons — anything)."
+        )
+
+    elif data == "broadcast:stop":
+        await broadcaster.stop()
+        await query.edit_message_text("⏹ Broadcast stopped.")
 
     elif data.startswith("toggle"):
         _, uid, action = data.split(":")
         if action == "block":
-            with open(BLOCKED_FILE, "a") as f:
-                f.write(uid + "\n")
+            ban_user(uid)
             await query.edit_message_text(f"✅ Blocked user {uid}")
         elif action == "unblock":
-            with open(BLOCKED_FILE, "r") as f:
-                lines = f.read().splitlines()
-            with open(BLOCKED_FILE, "w") as f:
-                for line in lines:
-                    if line != uid:
-                        f.write(line + "\n")
+            unban_user(uid)
             await query.edit_message_text(f"✅ Unblocked user {uid}")
 
+# ✅ /broadcast as a reply to the message to announce
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if str(update.effective_user.id) != BOT_OWNER_ID:
+        return
+    source = update.message.reply_to_message
+    if not source:
+        await update.message.reply_text("❌ Reply to the message you want to broadcast with /broadcast.")
+        return
+    if broadcaster.running:
+        await update.message.reply_text("⏳ A broadcast is already running. Stop it from the admin panel first.")
+        return
+
+    total = user_store.count("users")
+    status = await update.message.reply_text(f"📣 Broadcast started → {total} users")
+    broadcaster.start(context.bot, source.chat_id, source.message_id, status.chat_id, status.message_id, total)
+
 async def handle_admin_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if str(update.effective_user.id) != BOT_OWNER_ID:
         return
@@ -117,15 +132,8 @@ async def handle_admin_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Invalid User ID.")
         return
 
-    with open(BLOCKED_FILE, "r") as f:
-        blocked = set(f.read().splitlines())
-
-    if user_id in blocked:
-        blocked.remove(user_id)
-        with open(BLOCKED_FILE, "w") as f:
-            f.write("\n".join(blocked) + "\n")
+    if unban_user(user_id):
         await update.message.reply_text(f"✅ Unblocked {user_id}")
     else:
-        with open(BLOCKED_FILE, "a") as f:
-            f.write(user_id + "\n")
+        ban_user(user_id)
         await update.message.reply_text(f"✅ Blocked {user_id}")
\ No newline at end of file
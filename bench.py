@@ -0,0 +1,293 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+
+# ✅ Benchmarks & simulations, kept out of the bot modules:
+#   python bench.py search [catalog_size ...]     trigram index vs difflib
+#   python bench.py ratelimit                     rate limiter memory under user churn
+#   python bench.py webhook [updates] [per_second] [one_way_ms]
+#   python bench.py persistence [users] [changed_per_run]
+#   python bench.py broadcast [users]
+#   python bench.py processor
+# Importing the bot modules creates their logs/ files (user store, strike log,
+# state DB …), so everything runs inside a throwaway directory.
+REPO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO)
+os.chdir(tempfile.mkdtemp(prefix="bench-"))
+
+
+# ✅ Trigram index vs the old difflib path on a synthetic catalog
+def bench_search(args):
+    from difflib import get_close_matches
+    from search import SearchIndex, SEARCH_LIMIT, SEARCH_CUTOFF
+
+    random.seed(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(random.choices(letters, k=random.randint(4, 8))) for _ in range(5000)]
+    queries = [" ".join(random.sample(words, 2))[:-1] for _ in range(20)]
+    sizes = [int(n) for n in args] or [1_000, 10_000, 100_000]
+
+    for size in sizes:
+        catalog = {
+            f"{' '.join(random.choices(words, k=random.randint(2, 4))).title()} {n}": {}
+            for n in range(size)
+        }
+        started = time.perf_counter()
+        index = SearchIndex(catalog)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for q in queries:
+            index._search(q, SEARCH_LIMIT, SEARCH_CUTOFF)
+        trigram_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        line = f"{size:>7} titles | build {build_ms:8.1f} ms | trigram {trigram_ms:8.2f} ms/query"
+        if size <= 20_000:
+            titles = list(catalog)
+            started = time.perf_counter()
+            for q in queries:
+                get_close_matches(q, titles, n=SEARCH_LIMIT, cutoff=SEARCH_CUTOFF)
+            difflib_ms = (time.perf_counter() - started) * 1000 / len(queries)
+            line += f" | difflib {difflib_ms:8.2f} ms/query | x{difflib_ms / trigram_ms:.0f}"
+        print(line)
+
+
+# ✅ A million distinct users churning through (fake clock): tracked buckets
+# and memory stay flat instead of growing per user
+def bench_ratelimit(args):
+    import tracemalloc
+    from security import RateLimiter
+
+    fake_now = [0.0]
+    limiter = RateLimiter(clock=lambda: fake_now[0])
+    tracemalloc.start()
+    started = time.perf_counter()
+    for n in range(1, 1_000_001):
+        fake_now[0] = n * 0.001          # 1000 new users per simulated second
+        limiter.hit(n)
+        if n % 200_000 == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{n:>9} users | tracked {len(limiter):>6} | mem {current / 1e6:6.2f} MB | peak {peak / 1e6:6.2f} MB")
+    elapsed = time.perf_counter() - started
+    print(f"{1_000_000 / elapsed:,.0f} checks/s")
+
+
+# ✅ Polling vs webhook latency. A fake update source emits updates (Poisson
+# arrivals). Webhook: each one is POSTed through a real WebhookServer on
+# localhost after one network leg. Polling: a getUpdates long-poll loop with
+# the same one-way delay per leg — updates that arrive while a poll is
+# travelling wait for the next one.
+def bench_webhook(args):
+    import httpx
+    from webhook import WebhookServer, SECRET_HEADER
+
+    count = int(args[0]) if len(args) > 0 else 300
+    rate = float(args[1]) if len(args) > 1 else 30
+    delay = (float(args[2]) if len(args) > 2 else 40) / 1000
+    random.seed(1)
+    gaps = [random.expovariate(rate) for _ in range(count)]
+
+    async def polling_latencies():
+        waiting = []  # creation times of updates queued at "Telegram"
+        arrived = asyncio.Event()
+        latencies = []
+
+        async def source():
+            for gap in gaps:
+                await asyncio.sleep(gap)
+                waiting.append(time.perf_counter())
+                arrived.set()
+
+        async def poller():
+            while len(latencies) < count:
+                await asyncio.sleep(delay)          # getUpdates request → Telegram
+                while not waiting:                  # long poll held open
+                    arrived.clear()
+                    await arrived.wait()
+                batch = waiting[:]
+                waiting.clear()
+                await asyncio.sleep(delay)          # response → bot
+                now = time.perf_counter()
+                latencies.extend(now - created for created in batch)
+
+        await asyncio.gather(source(), poller())
+        return latencies
+
+    async def webhook_latencies():
+        latencies = []
+
+        async def on_update(data):
+            latencies.append(time.perf_counter() - data["created"])
+
+        server = await WebhookServer(on_update, path="/hook", secret="s3cret",
+                                     listen="127.0.0.1", port=0).start()
+        url = f"http://127.0.0.1:{server.port}/hook"
+        async with httpx.AsyncClient(limits=httpx.Limits(max_connections=40)) as client:
+            async def deliver(update_id, created):
+                await asyncio.sleep(delay)          # Telegram → bot
+                await client.post(url, json={"update_id": update_id, "created": created},
+                                  headers={SECRET_HEADER: "s3cret"})
+
+            forged = await client.post(url, json={}, headers={SECRET_HEADER: "wrong"})
+            tasks = []
+            for update_id, gap in enumerate(gaps):
+                await asyncio.sleep(gap)
+                tasks.append(asyncio.create_task(deliver(update_id, time.perf_counter())))
+            await asyncio.gather(*tasks)
+        await server.stop()
+        print(f"forged secret → HTTP {forged.status_code}")
+        return latencies
+
+    def summary(name, latencies):
+        latencies = sorted(latencies)
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+        print(f"{name:<8} p50 {pick(0.5):7.1f} ms | p95 {pick(0.95):7.1f} ms | max {latencies[-1] * 1000:7.1f} ms")
+
+    print(f"{count} updates at ~{rate:g}/s, {delay * 1000:.0f} ms one-way network delay")
+    summary("polling", asyncio.run(polling_latencies()))
+    summary("webhook", asyncio.run(webhook_latencies()))
+
+
+# ✅ Cost of one persistence run when a few users paged: full pickle rewrite
+# (what PicklePersistence does on every flush) vs the delta commit
+def bench_persistence(args):
+    import pickle
+    from categories import CATEGORIES, ACTIVE_KEY
+    from persistence import PaginationPersistence
+
+    users = int(args[0]) if len(args) > 0 else 100_000
+    changed = int(args[1]) if len(args) > 1 else 500
+    names = [category.name for category in CATEGORIES.values()]
+    user_data = {}
+    for user_id in range(users):
+        category = CATEGORIES[random.choice(names)]
+        user_data[user_id] = {ACTIVE_KEY: category.name, category.page_key: random.randint(1, 20)}
+
+    async def bench():
+        folder = tempfile.mkdtemp()
+        started = time.perf_counter()
+        with open(os.path.join(folder, "state.pickle"), "wb") as f:
+            pickle.dump(user_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle_ms = (time.perf_counter() - started) * 1000
+
+        store = PaginationPersistence(os.path.join(folder, "state.db"))
+        for user_id, data in user_data.items():
+            await store.update_user_data(user_id, data)
+        await store.commit()  # initial load, not timed
+
+        touched = random.sample(range(users), changed)
+        started = time.perf_counter()
+        for user_id in touched:
+            user_data[user_id][ACTIVE_KEY] = "anime"
+            user_data[user_id]["anime_page"] = user_data[user_id].get("anime_page", 0) + 1
+            await store.update_user_data(user_id, user_data[user_id])
+        await store.commit()
+        delta_ms = (time.perf_counter() - started) * 1000
+        size = os.path.getsize(os.path.join(folder, "state.pickle"))
+
+        print(f"{users} users, {changed} changed | pickle rewrite {pickle_ms:7.1f} ms ({size / 1e6:.1f} MB) "
+              f"| delta commit {delta_ms:6.1f} ms ({store.commits} commits, {store.rows_written} rows total)")
+        await store.flush()
+
+    asyncio.run(bench())
+
+
+# ✅ Broadcast against a fake bot with 50 ms sends, a flood-wait every 2000
+# sends and 5% dead chats: throughput stays pinned at BROADCAST_RATE and
+# flood waits are obeyed
+def bench_broadcast(args):
+    from telegram.error import RetryAfter, Forbidden
+    from broadcast import Broadcaster, BROADCAST_RATE
+
+    users = int(args[0]) if args else 500
+
+    class FakeBot:
+        def __init__(self):
+            self.sends = 0
+            self.delivered = set()
+
+        async def copy_message(self, chat_id, from_chat_id, message_id):
+            self.sends += 1
+            await asyncio.sleep(0.05)
+            if self.sends % 2000 == 0:
+                raise RetryAfter(1)
+            if chat_id % 20 == 0:
+                raise Forbidden("bot was blocked by the user")
+            self.delivered.add(chat_id)
+
+        async def edit_message_text(self, text, **kwargs):
+            print(text.split("\n")[-1])
+
+    async def simulate():
+        ids = sorted(random.sample(range(1, users * 10), users))
+
+        def recipients(after=-1):
+            return (uid for uid in ids if uid > after)
+
+        path = os.path.join(tempfile.mkdtemp(), "broadcast.json")
+        caster = Broadcaster(path, recipients=recipients, on_dead=lambda uid: None, skip=lambda uid: False)
+        bot = FakeBot()
+        started = time.perf_counter()
+        caster.start(bot, 1, 1, 1, 1, total=users)
+        await caster.task
+        elapsed = time.perf_counter() - started
+        print(f"{users} users in {elapsed:.1f}s → {users / elapsed:.1f} msg/s (limit {BROADCAST_RATE:g})")
+        print(f"delivered {len(bot.delivered)} | unique {len(bot.delivered) == len(set(bot.delivered))}")
+
+    asyncio.run(simulate())
+
+
+# ✅ One user sends 5 slow poster replies (1 s each) while 50 other users send
+# a quick message each: their latency vs sequential processing, and the slow
+# user's updates still run in order
+def bench_processor(args):
+    import types
+    from telegram.ext import SimpleUpdateProcessor
+    from processor import PerUserUpdateProcessor
+
+    def fake_update(user_id):
+        return types.SimpleNamespace(user_id=user_id)
+
+    async def simulate(processor, name):
+        order, latencies = [], []
+        started = time.perf_counter()
+
+        async def handle(update, seq, slow):
+            await asyncio.sleep(1.0 if slow else 0.02)
+            if slow:
+                order.append(seq)
+            else:
+                latencies.append(time.perf_counter() - started)
+
+        updates = [(fake_update(1), n, True) for n in range(5)]
+        updates += [(fake_update(100 + n), n, False) for n in range(50)]
+        if processor.max_concurrent_updates > 1:
+            tasks = [asyncio.create_task(processor.process_update(u, handle(u, n, slow))) for u, n, slow in updates]
+            await asyncio.gather(*tasks)
+        else:
+            for u, n, slow in updates:
+                await processor.process_update(u, handle(u, n, slow))
+        latencies.sort()
+        print(f"{name:<11} others p50 {latencies[len(latencies) // 2] * 1000:7.0f} ms | "
+              f"max {latencies[-1] * 1000:7.0f} ms | slow user order {order}")
+
+    asyncio.run(simulate(SimpleUpdateProcessor(1), "sequential"))
+    asyncio.run(simulate(PerUserUpdateProcessor(8, key=lambda update: update.user_id), "per-user"))
+
+
+BENCHMARKS = {
+    "search": bench_search,
+    "ratelimit": bench_ratelimit,
+    "webhook": bench_webhook,
+    "persistence": bench_persistence,
+    "broadcast": bench_broadcast,
+    "processor": bench_processor,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        raise SystemExit(f"usage: python bench.py {{{'|'.join(BENCHMARKS)}}} [args ...]")
+    BENCHMARKS[sys.argv[1]](sys.argv[2:])
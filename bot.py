@@ -2,30 +2,34 @@ import os
 import logging
 from dotenv import load_dotenv
 from telegram import Update, ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.constants import ChatMemberStatus
 from telegram.ext import (
-    ApplicationBuilder, CommandHandler, MessageHandler,
-    CallbackQueryHandler, ContextTypes, filters
+    ApplicationBuilder, CommandHandler, MessageHandler, TypeHandler,
+    CallbackQueryHandler, InlineQueryHandler, ContextTypes, ApplicationHandlerStop, filters
 )
 
-from user_logger import log_user, is_banned, handle_bot_block, BOT_OWNER_ID
-from security import is_user_allowed
+from user_logger import log_user, is_banned, handle_bot_block, strike_log, BOT_OWNER_ID
+from security import check_flood
 from howtouse import send_how_to_use
 from request import handle_request
-from search import search_movie
+from search import search_movie, get_search_index, inline_search
 
-import latest, series, anime, kdrama, south, hollywood, bollywood, marvel, eighteenplus, multipart
-import eighteenplus as eighteen  # ✅ This line is required to fix the KeyError
-from admin import admin_panel, handle_admin_callback, handle_admin_id
+from categories import CATEGORIES, get_category, get_active_category
+from snapshot import load_catalog
+from watcher import CatalogWatcher
+from membership import get_missing_channels
+from names import name_resolver
+from posters import reply_poster
+from admin import admin_panel, handle_admin_callback, handle_admin_id, broadcast_command
+from broadcast import broadcaster
+from webhook import run_bot
+from processor import update_processor
+from persistence import state_persistence
 
 
 # Load environment variables
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
-# Force Join Channels
-FORCE_JOIN_CHANNELS = ["@cinepulsebot_official", "@modflux_99"]
-
 # Logging
 logging.basicConfig(format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO)
 
@@ -48,16 +52,7 @@ def build_menu_keyboard(user_id):
 # ✅ Force Join Checker
 async def check_force_join(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     user_id = update.effective_user.id
-    not_joined = []
-
-    for ch in FORCE_JOIN_CHANNELS:
-        try:
-            member = await context.bot.get_chat_member(ch, user_id)
-            if member.status not in [ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
-                not_joined.append(ch)
-        except Exception as e:
-            logging.warning(f"Join check failed for {ch}: {e}")
-            not_joined.append(ch)
+    not_joined = await get_missing_channels(context.bot, user_id)
 
     if not_joined:
         text = """
@@ -87,19 +82,70 @@ async def check_force_join(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         return False
     return True
 
-# ✅ /start command
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+# ✅ Which RATE_LIMITS scope an update counts against:
+# command name, category being opened/browsed, search, inline or callback
+def rate_scope(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
+    if update.inline_query:
+        return "inline"
+    if update.callback_query:
+        return "callback"
+    text = (update.message.text or "") if update.message else ""
+    if text.startswith("/"):
+        return text[1:].split(" ", 1)[0].split("@", 1)[0].lower() or "default"  # "/start@Bot x" → start
+    category = CATEGORY_ROUTES.get(text) or get_active_category(context.user_data)
+    if category:
+        return category.name
+    if not text or text in MENU_ROUTES:
+        return "default"
+    return "search"
+
+# ✅ Access checks, each computed at most once per update.
+# Results are memoized on the update's CallbackContext (shared by every
+# handler group), so handlers can re-ask for free.
+async def gate_passed(update: Update, context: ContextTypes.DEFAULT_TYPE, force_join=True) -> bool:
+    verdict = context.__dict__.setdefault("gate", {})
     user_id = update.effective_user.id
-    if is_banned(user_id):
-        return
 
-    if not await check_force_join(update, context):
-        return
+    if "banned" not in verdict:
+        verdict["banned"] = is_banned(user_id)
+    if verdict["banned"]:
+        return False
 
-    if not is_user_allowed(update):
+    if force_join:
+        if "joined" not in verdict:
+            verdict["joined"] = await check_force_join(update, context)
+        if not verdict["joined"]:
+            return False
+
+    if "allowed" not in verdict:
+        # Inline queries arrive per keystroke → search.inline_search counts them after its debounce
+        verdict["allowed"] = update.inline_query is not None or check_flood(user_id, rate_scope(update, context))
+    if not verdict["allowed"]:
+        return False
+
+    # Only chats that messaged the bot can receive from it (broadcasts, admin
+    # lists); inline-only users never started it, so they aren't registered
+    if "registered" not in verdict:
+        if update.message:
+            log_user(user_id)
+        verdict["registered"] = True
+    return True
+
+# ✅ Pre-dispatch middleware (handler group -1): runs before every handler.
+# Messages get the full gate; callback buttons skip force-join so the
+# "I’ve Joined" button still works for users who aren't members yet, and
+# inline queries get their force-join check in search.inline_search.
+async def pre_dispatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user is None:
         return
+    if not await gate_passed(update, context, force_join=update.message is not None):
+        raise ApplicationHandlerStop
 
-    log_user(user_id)
+# ✅ /start command
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+    if not await gate_passed(update, context):
+        return
 
     await context.bot.send_message(
         chat_id=user_id,
@@ -121,14 +167,8 @@ async def joined_check_callback(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = query.from_user.id
     await query.answer()
 
-    not_joined = []
-    for ch in FORCE_JOIN_CHANNELS:
-        try:
-            member = await context.bot.get_chat_member(ch, user_id)
-            if member.status not in [ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
-                not_joined.append(ch)
-        except Exception:
-            not_joined.append(ch)
+    # Button pressed → drop the cached verdict and ask Telegram again
+    not_joined = await get_missing_channels(context.bot, user_id, fresh=True)
 
     if not_joined:
         text = """
@@ -149,77 +189,58 @@ async def joined_check_callback(update: Update, context: ContextTypes.DEFAULT_TY
         await query.edit_message_text("✅ Access Granted!")
         await start(update, context)
 
+# ✅ Menu actions (non-category buttons)
+NOT_HANDLED = object()
+
+async def prompt_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("🔍 Please type the name of the movie or series to search.")
+
+async def back_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.user_data.clear()
+    await update.message.reply_text("🏠 Back to main menu", reply_markup=build_menu_keyboard(update.effective_user.id))
+
+async def open_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if str(update.effective_user.id) != BOT_OWNER_ID:
+        return NOT_HANDLED
+    await admin_panel(update, context)
+
+# ✅ Button text → handler, built once
+CATEGORY_ROUTES = {category.button: category for category in CATEGORIES.values()}
+MENU_ROUTES = {
+    "𝐇𝐨𝐰 𝐭𝐨 𝐔𝐬𝐞 📘💡": send_how_to_use,
+    "𝐑𝐞𝐪𝐮𝐞𝐬𝐭 𝐚 𝐂𝐨𝐧𝐭𝐞𝐧𝐭 📝💌": handle_request,
+    "𝐒𝐞𝐚𝐫𝐜𝐡 🔍🧠": prompt_search,
+    "🏠 Main Menu": back_to_main_menu,
+    "👑 Admin Panel": open_admin_panel,
+}
+
 # ✅ Handle All Messages
 async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
-    if is_banned(user_id):
-        return
-    if not await check_force_join(update, context):
+    if not await gate_passed(update, context):
         return
-    if not is_user_allowed(update):
-        return
-    log_user(user_id)
 
     text = update.message.text
 
-    # Categories
-    if text == "𝐋𝐚𝐭𝐞𝐬𝐭 𝐑𝐞𝐥𝐞𝐚𝐬𝐞𝐬 ✨🎞️":
-        context.user_data["latest_page"] = 1
-        await latest.show_latest(update, context, 1)
-    elif text == "𝐀𝐧𝐢𝐦𝐞 💀🔥":
-        context.user_data["anime_page"] = 1
-        await anime.show_anime(update, context, 1)
-    elif text == "𝐖𝐞𝐛𝐬𝐞𝐫𝐢𝐞𝐬 🎭📺":
-        context.user_data["series_page"] = 1
-        await series.show_series(update, context, 1)
-    elif text == "𝐊-𝐃𝐫𝐚𝐦𝐚𝐬 💕✨":
-        context.user_data["kdrama_page"] = 1
-        await kdrama.show_kdrama(update, context, 1)
-    elif text == "𝐒𝐨𝐮𝐭𝐡 𝐌𝐨𝐯𝐢𝐞𝐬 💣🔥":
-        context.user_data["south_page"] = 1
-        await south.show_south(update, context, 1)
-    elif text == "𝐇𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 🎬🌍":
-        context.user_data["hollywood_page"] = 1
-        await hollywood.show_hollywood(update, context, 1)
-    elif text == "𝐁𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 🌟🎥":
-        context.user_data["bollywood_page"] = 1
-        await bollywood.show_bollywood(update, context, 1)
-    elif text == "𝐌𝐚𝐫𝐯𝐞𝐥 + 𝐃𝐂 🦸‍♂️⚡":
-        context.user_data["marvel_page"] = 1
-        await marvel.show_marvel(update, context, 1)
-    elif text == "𝟏𝟖+ 𝐂𝐨𝐧𝐭𝐞𝐧𝐭 🔞🔥":
-        context.user_data["eighteen_page"] = 1
-        await eighteenplus.show_eighteen(update, context, 1)
-    elif text == "𝗠𝘂𝗹𝘁𝗶-𝗣𝗮𝗿𝘁 𝗠𝗼𝘃𝗶𝗲𝘀 🎬":
-        context.user_data["multipart_page"] = 1
-        await multipart.show_multiparts(update, context, 1)
-    elif text == "𝐇𝐨𝐰 𝐭𝐨 𝐔𝐬𝐞 📘💡":
-        await send_how_to_use(update, context)
-    elif text == "𝐑𝐞𝐪𝐮𝐞𝐬𝐭 𝐚 𝐂𝐨𝐧𝐭𝐞𝐧𝐭 📝💌":
-        await handle_request(update, context)
-    elif text == "𝐒𝐞𝐚𝐫𝐜𝐡 🔍🧠":
-        await update.message.reply_text("🔍 Please type the name of the movie or series to search.")
-    elif text == "🏠 Main Menu":
-        context.user_data.clear()
-        await update.message.reply_text("🏠 Back to main menu", reply_markup=build_menu_keyboard(user_id))
-    elif text == "👑 Admin Panel" and str(user_id) == BOT_OWNER_ID:
-        await admin_panel(update, context)
-    else:
-        # Pagination fallback or Search
-        for section in [
-            "anime", "series", "latest", "kdrama", "south", "hollywood",
-            "bollywood", "marvel", "eighteen", "multipart"
-        ]:
-            if context.user_data.get(f"{section}_page"):
-                handler = getattr(globals()[section], f"handle_{section}_buttons")
-                await handler(update, context)
-                return
-        await handle_search(update, context)
+    # Menu buttons → one dict lookup
+    category = CATEGORY_ROUTES.get(text)
+    if category:
+        await get_category(category.name).show(update, context, 1)
+        return
+    route = MENU_ROUTES.get(text)
+    if route and await route(update, context) is not NOT_HANDLED:
+        return
+
+    # Pagination fallback (the one category the user is browsing) or Search
+    category = get_active_category(context.user_data)
+    if category:
+        await category.handle(update, context)
+        return
+    await handle_search(update, context)
 
 # ✅ Search Text Handler
 async def handle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    if is_banned(user_id):
+    if not await gate_passed(update, context):
         return
     try:
         query = update.message.text.strip()
@@ -227,7 +248,7 @@ async def handle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if result:
             title, poster, caption = result
             if poster:
-                await update.message.reply_photo(photo=poster, caption=caption, parse_mode="HTML")
+                await reply_poster(update.message, title, poster, caption=caption, parse_mode="HTML")
             else:
                 await update.message.reply_text(caption, parse_mode="HTML")
         else:
@@ -236,17 +257,51 @@ async def handle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logging.error(f"Search error: {e}")
         handle_bot_block(user_id)
 
+# ✅ Background tasks tied to the Application lifecycle
+catalog_watcher = CatalogWatcher()
+
+async def on_startup(app):
+    catalog_watcher.start()
+    state_persistence.start(app)
+    if await broadcaster.resume(app.bot):
+        print("📣 Resuming unfinished broadcast")
+
+# The bot's HTTP client is still open here (post_shutdown runs after it's
+# closed), so a broadcast send can't fail on the way out and be checkpointed
+async def on_stop(app):
+    await broadcaster.stop(keep=True)
+
+async def on_shutdown(app):
+    catalog_watcher.stop()
+    state_persistence.stop()
+    await name_resolver.close()
+    strike_log.close()
+
 # ✅ Run Bot
 if __name__ == "__main__":
     print("🚀 Bot is starting...")
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    source = load_catalog()
+    print(f"📚 Catalog loaded from {source}: {len(CATEGORIES)} categories, {len(get_search_index())} searchable titles")
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .concurrent_updates(update_processor)
+        .persistence(state_persistence)
+        .build()
+    )
 
+    app.add_handler(TypeHandler(Update, pre_dispatch), group=-1)
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CallbackQueryHandler(joined_check_callback, pattern="check_joined"))
+    app.add_handler(InlineQueryHandler(inline_search, block=False))
     app.add_handler(CommandHandler("admin", admin_panel))
-    app.add_handler(CallbackQueryHandler(handle_admin_callback, pattern="^(show_|toggle:)"))
+    app.add_handler(CommandHandler("broadcast", broadcast_command))
+    app.add_handler(CallbackQueryHandler(handle_admin_callback, pattern="^(show_|toggle:|broadcast:)"))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & filters.User(BOT_OWNER_ID), handle_admin_id))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_buttons))
 
     print("✅ CinePulseBot is running...")
-    app.run_polling()
\ No newline at end of file
+    run_bot(app)
\ No newline at end of file
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import asyncio
+from telegram.error import RetryAfter, Forbidden, BadRequest, NetworkError
+from user_logger import user_store, is_banned, handle_bot_block
+
+# ✅ Broadcast settings (Telegram allows ~30 msg/s per bot overall)
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "25"))             # messages per second
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "10"))  # sends in flight
+BROADCAST_STATE_FILE = os.getenv("BROADCAST_STATE_FILE", "logs/broadcast.json")
+PROGRESS_EVERY = 5       # seconds between progress edits / checkpoints
+MAX_ATTEMPTS = 3         # per recipient (flood waits don't count)
+
+# ✅ Shared async token bucket: every send takes one token. A flood-wait from
+# Telegram pauses the whole bucket, since the limit it reports is bot-wide.
+class TokenBucket:
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:  # waiters are served in arrival order
+            while True:
+                now = self.clock()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+# Errors meaning the chat is gone for good (blocked, deleted, never started)
+def is_dead_chat(error):
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and "chat not found" in str(error).lower()
+
+# ✅ One admin broadcast at a time: copies a message from the admin's chat to
+# every known user. Recipients are streamed from the user store in id order;
+# the checkpoint is the highest id below which every send has finished, plus
+# the few ids above it that already finished out of order, so a restart
+# resumes right after it without re-sending to anyone.
+class Broadcaster:
+    def __init__(self, path=BROADCAST_STATE_FILE, rate=BROADCAST_RATE,
+                 concurrency=BROADCAST_CONCURRENCY, recipients=user_store.iter_ids,
+                 on_dead=handle_bot_block, skip=is_banned):
+        self.path = path
+        self.rate = rate
+        self.concurrency = concurrency
+        self.recipients = recipients
+        self.on_dead = on_dead
+        self.skip = skip
+        self.state = None
+        self.task = None
+        self.inflight = set()
+        self.completed = set()
+        self.last_queued = -1
+        self.run_started = 0.0
+        self.run_done = 0
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    # ✅ Start a new broadcast of (from_chat_id, message_id); False if one is running
+    def start(self, bot, from_chat_id, message_id, status_chat_id, status_message_id, total):
+        if self.running:
+            return False
+        self.state = {
+            "from_chat_id": from_chat_id,
+            "message_id": message_id,
+            "status_chat_id": status_chat_id,
+            "status_message_id": status_message_id,
+            "after": -1,
+            "done": [],
+            "total": total,
+            "sent": 0,
+            "dead": 0,
+            "failed": 0,
+            "skipped": 0,
+            "started_at": time.time(),
+        }
+        self.save()
+        self.task = asyncio.create_task(self.run(bot))
+        return True
+
+    # ✅ Pick up an unfinished broadcast after a restart (called from on_startup)
+    async def resume(self, bot):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"[❌] Failed to load {self.path}: {e}")
+            return False
+        try:
+            status = await bot.send_message(self.state["status_chat_id"], "▶️ Resuming broadcast...")
+            self.state["status_message_id"] = status.message_id
+        except Exception as e:
+            print(f"[❗] Broadcast status: {e}")
+        self.task = asyncio.create_task(self.run(bot))
+        return True
+
+    # ✅ Abort: cancel and forget the checkpoint (shutdown uses stop(keep=True))
+    async def stop(self, keep=False):
+        if self.running:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if not keep:
+            self.clear()
+
+    async def run(self, bot):
+        state = self.state
+        bucket = TokenBucket(self.rate)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        self.inflight = set()
+        self.completed = set(state["done"])
+        self.last_queued = state["after"]
+        self.run_started = time.monotonic()
+        self.run_done = 0
+
+        async def produce():
+            for user_id in self.recipients(after=state["after"]):
+                if user_id in self.completed:
+                    continue
+                if self.skip(user_id):
+                    state["skipped"] += 1
+                    continue
+                self.inflight.add(user_id)
+                self.last_queued = user_id
+                await queue.put(user_id)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                user_id = await queue.get()
+                if user_id is None:
+                    return
+                state[await self.deliver(bot, bucket, user_id)] += 1
+                self.inflight.discard(user_id)
+                self.completed.add(user_id)
+                self.run_done += 1
+
+        workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        reporter = asyncio.create_task(self.report(bot))
+        try:
+            await asyncio.gather(produce(), *workers)
+        except BaseException:
+            # Cancelled, or the producer failed (SQLite error, skip() raised …):
+            # keep what was done so a restart resumes from here
+            self.checkpoint()
+            raise
+        finally:
+            reporter.cancel()
+            for task in workers:
+                task.cancel()
+
+        await self.edit_status(bot, "✅ <b>Broadcast finished</b>\n\n" + self.progress_text())
+        self.clear()
+
+    # ✅ One recipient → "sent" / "dead" / "failed"
+    async def deliver(self, bot, bucket, user_id):
+        state = self.state
+        attempts = 0
+        while True:
+            await bucket.acquire()
+            try:
+                await bot.copy_message(user_id, state["from_chat_id"], state["message_id"])
+                return "sent"
+            except RetryAfter as e:
+                bucket.pause(e.retry_after)
+                continue
+            except Exception as e:
+                if is_dead_chat(e):
+                    self.on_dead(user_id)
+                    return "dead"
+                # Only transient network errors are retried (BadRequest subclasses NetworkError)
+                attempts += 1
+                transient = isinstance(e, NetworkError) and not isinstance(e, BadRequest)
+                if not transient or attempts >= MAX_ATTEMPTS:
+                    print(f"[❗] Broadcast to {user_id} failed: {e}")
+                    return "failed"
+
+    # ✅ Live progress for the admin + periodic checkpoint
+    async def report(self, bot):
+        while True:
+            await asyncio.sleep(PROGRESS_EVERY)
+            self.checkpoint()
+            await self.edit_status(bot, "📣 <b>Broadcasting...</b>\n\n" + self.progress_text())
+
+    def progress_text(self):
+        state = self.state
+        done = state["sent"] + state["dead"] + state["failed"] + state["skipped"]
+        total = max(state["total"], done)
+        elapsed = time.monotonic() - self.run_started
+        speed = self.run_done / elapsed if elapsed > 0 else 0.0
+        remaining = total - done
+        eta = f"{remaining / speed / 60:.1f} min" if speed and remaining else "—"
+        return (
+            f"📨 {done}/{total} ({done * 100 // max(total, 1)}%)\n"
+            f"✅ Sent: {state['sent']} | 💀 Dead: {state['dead']} | ❗ Failed: {state['failed']} | 🚫 Skipped: {state['skipped']}\n"
+            f"⚡ {speed:.1f} msg/s | ⏳ ETA: {eta}"
+        )
+
+    def status_line(self):
+        if not self.running:
+            return "📣 Broadcast: idle"
+        return "📣 Broadcast running\n" + self.progress_text()
+
+    async def edit_status(self, bot, text):
+        state = self.state
+        try:
+            await bot.edit_message_text(
+                text, chat_id=state["status_chat_id"],
+                message_id=state["status_message_id"], parse_mode="HTML",
+            )
+        except Exception as e:
+            if "not modified" not in str(e).lower():
+                print(f"[❗] Broadcast status: {e}")
+
+    # Everything up to the smallest id still in flight is finished
+    def checkpoint(self):
+        if self.state is None:
+            return
+        if self.inflight:
+            after = min(self.inflight) - 1
+        else:
+            after = self.last_queued
+        self.completed = {uid for uid in self.completed if uid > after}
+        self.state["after"] = after
+        self.state["done"] = sorted(self.completed)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.state = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+broadcaster = Broadcaster()
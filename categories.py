@@ -0,0 +1,162 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+from posters import reply_poster
+from utils import (
+    LINK_HELP, load_json, build_button_index, lookup_button,
+    page_count, build_page_keyboard,
+)
+
+# ✅ user_data slot holding the name of the category the user is browsing
+ACTIVE_KEY = "active_category"
+
+# ✅ One entry per category — adding a category is one line here
+CATEGORY_REGISTRY = [
+    {"name": "latest", "button": "𝐋𝐚𝐭𝐞𝐬𝐭 𝐑𝐞𝐥𝐞𝐚𝐬𝐞𝐬 ✨🎞️", "data_file": "latest_data.json", "header": "✨🎬 𝐋𝐚𝐭𝐞𝐬𝐭 𝐑𝐞𝐥𝐞𝐚𝐬𝐞𝐬", "audio": "Hindi + Multi Audio", "page_key": "latest_page"},
+    {"name": "anime", "button": "𝐀𝐧𝐢𝐦𝐞 💀🔥", "data_file": "anime_data.json", "header": "💀🔥 𝐀𝐧𝐢𝐦𝐞 𝐖𝐨𝐫𝐥𝐝", "audio": "Hindi - Japanese", "page_key": "anime_page"},
+    {"name": "series", "button": "𝐖𝐞𝐛𝐬𝐞𝐫𝐢𝐞𝐬 🎭📺", "data_file": "series_data.json", "header": "📺🔥 𝐓𝐨𝐩 𝐖𝐞𝐛 𝐒𝐞𝐫𝐢𝐞𝐬", "audio": "Hindi + Multi Audio", "page_key": "series_page"},
+    {"name": "kdrama", "button": "𝐊-𝐃𝐫𝐚𝐦𝐚𝐬 💕✨", "data_file": "kdrama_data.json", "header": "🎎 Choose a K-Drama:", "audio": "Hindi - Korean", "page_key": "kdrama_page"},
+    {"name": "south", "button": "𝐒𝐨𝐮𝐭𝐡 𝐌𝐨𝐯𝐢𝐞𝐬 💣🔥", "data_file": "south_data.json", "header": "🔥🎭 𝐒𝐨𝐮𝐭𝐡 𝐈𝐧𝐝𝐢𝐚𝐧 𝐂𝐨𝐥𝐥𝐞𝐜𝐭𝐢𝐨𝐧", "audio": "Hindi + Multi Audio", "page_key": "south_page"},
+    {"name": "hollywood", "button": "𝐇𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 🎬🌍", "data_file": "hollywood_data.json", "header": "🎥🕶️ 𝐇𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 𝐂𝐢𝐧𝐞𝐦𝐚 𝐖𝐨𝐫𝐥𝐝", "audio": "Hindi + Multi Audio", "page_key": "hollywood_page"},
+    {"name": "bollywood", "button": "𝐁𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 🌟🎥", "data_file": "bollywood_data.json", "header": "🎶🎥 𝐁𝐨𝐥𝐥𝐲𝐰𝐨𝐨𝐝 𝐁𝐥𝐨𝐜𝐤𝐛𝐮𝐬𝐭𝐞𝐫𝐬", "audio": "Hindi + Multi Audio", "page_key": "bollywood_page"},
+    {"name": "marvel", "button": "𝐌𝐚𝐫𝐯𝐞𝐥 + 𝐃𝐂 🦸‍♂️⚡", "data_file": "marvel_data.json", "header": "🦸🛡️ 𝐌𝐚𝐫𝐯𝐞𝐥 + 𝐃𝐂 𝐂𝐨𝐥𝐥𝐞𝐜𝐭𝐢𝐨𝐧", "audio": "Hindi + Multi Audio", "page_key": "marvel_page"},
+    {"name": "eighteen", "button": "𝟏𝟖+ 𝐂𝐨𝐧𝐭𝐞𝐧𝐭 🔞🔥", "data_file": "eighteenplus_data.json", "header": "🔞🔥 𝟏𝟖+ 𝐂𝐨𝐧𝐭𝐞𝐧𝐭", "audio": "Hindi + Multi Audio", "page_key": "eighteen_page", "hide_dead_nav": True},
+    {"name": "multipart", "button": "𝗠𝘂𝗹𝘁𝗶-𝗣𝗮𝗿𝘁 𝗠𝗼𝘃𝗶𝗲𝘀 🎬", "data_file": "multipart_data.json", "header": "📦🍿 𝐌𝐮𝐥𝐭𝐢𝐩𝐚𝐫𝐭 𝐌𝐨𝐯𝐢𝐞𝐬 𝐂𝐨𝐥𝐥𝐞𝐜𝐭𝐢𝐨𝐧", "audio": "Hindi + Multi Audio", "page_key": "multipart_page"},
+]
+
+# ✅ A browsable catalog section: data, button index, page cache, captions
+class Category:
+    def __init__(self, name, button, data_file, header, audio, page_key, hide_dead_nav=False):
+        self.name = name
+        self.button = button
+        self.data_file = data_file
+        self.header = header
+        self.audio = audio
+        self.page_key = page_key
+        self.hide_dead_nav = hide_dead_nav
+        self.data = None
+        self.buttons = {}
+        self.captions = {}
+        self.pages = {}
+
+    # (Re)load the JSON file and rebuild everything derived from it
+    def load(self):
+        self.use(load_json(self.data_file))
+        return self
+
+    def use(self, data):
+        self.swap(data, self.build_indexes(data))
+
+    # Everything derived from the data; pure, so it may run in a worker thread
+    def build_indexes(self, data):
+        captions = {title: self.render(title, item) for title, item in data.items()}
+        return build_button_index(data), captions
+
+    # Replace data + indexes in one step (call from the event loop thread)
+    def swap(self, data, indexes):
+        buttons, captions = indexes
+        self.data, self.buttons, self.captions, self.pages = data, buttons, captions, {}
+
+    @property
+    def total_pages(self):
+        return page_count(self.data)
+
+    # Built once per page, shared by every user until the data changes
+    def keyboard(self, page):
+        markup = self.pages.get(page)
+        if markup is None:
+            markup = self.pages[page] = build_page_keyboard(self.data, page, self.hide_dead_nav)
+        return markup
+
+    # Final HTML for one item → (caption, overflow). Overflowing captions
+    # (> 1024 chars) are sent as a bare photo followed by a text message.
+    def render(self, title, item):
+        links = "\n".join(item.get("links", []))
+        audio = item.get("audio", self.audio)
+        caption = f"<b>{title}</b>\n\n🔊 Audio: {audio}\n\n{links}{LINK_HELP}"
+        return caption, len(caption) > 1024
+
+    # Show one page of titles
+    async def show(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page=1):
+        context.user_data[ACTIVE_KEY] = self.name
+        context.user_data[self.page_key] = page
+
+        if page < 1 or page > self.total_pages:
+            await update.message.reply_text("❌ No more pages.")
+            return
+
+        await update.message.reply_text(self.header, reply_markup=self.keyboard(page))
+
+    # Handle Back/Next or a title button while this category is open
+    async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        text = update.message.text.strip()
+        page = context.user_data.get(self.page_key, 1)
+
+        # Navigation
+        if text == "⏮ Back":
+            if page > 1:
+                await self.show(update, context, page - 1)
+            else:
+                await update.message.reply_text("❌ Already at first page.")
+            return
+
+        elif text == "⏭ Next":
+            if page < self.total_pages:
+                await self.show(update, context, page + 1)
+            else:
+                await update.message.reply_text("❌ No more pages.")
+            return
+
+        # Title match (O(1) button → item lookup)
+        match = lookup_button(self.buttons, text)
+        if not match:
+            await update.message.reply_text("❌ Invalid option. Please use the menu.")
+            return
+
+        title, item = match
+        await self.send_item(update, title, item)
+
+    async def send_item(self, update: Update, title, item):
+        poster = item.get("poster", "")
+        caption, overflow = self.captions.get(title) or self.render(title, item)
+
+        try:
+            if poster:
+                if overflow:
+                    await reply_poster(update.message, title, poster)
+                    await update.message.reply_text(caption, parse_mode="HTML")
+                else:
+                    await reply_poster(update.message, title, poster, caption=caption, parse_mode="HTML")
+            else:
+                await update.message.reply_text(caption, parse_mode="HTML")
+        except Exception as e:
+            print(f"[❗] Image error for {title}: {e}")
+            await update.message.reply_text(caption, parse_mode="HTML")
+
+# ✅ name → Category, in menu order
+CATEGORIES = {entry["name"]: Category(**entry) for entry in CATEGORY_REGISTRY}
+
+CATEGORIES_BY_FILE = {category.data_file: category for category in CATEGORIES.values()}
+
+def _load_or_empty(category):
+    try:
+        category.load()
+    except Exception as e:
+        print(f"[❌] Failed to load {category.data_file}: {e}")
+        category.use({})
+
+# ✅ Called once at startup from bot.py (and lazily on first use)
+def load_categories():
+    for category in CATEGORIES.values():
+        _load_or_empty(category)
+    return CATEGORIES
+
+# ✅ Category the user is currently browsing (or None)
+def get_active_category(user_data):
+    name = user_data.get(ACTIVE_KEY)
+    return get_category(name) if name in CATEGORIES else None
+
+def get_category(name):
+    category = CATEGORIES[name]
+    if category.data is None:
+        _load_or_empty(category)
+    return category
@@ -0,0 +1,179 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from telegram.constants import ChatMemberStatus
+from telegram.error import BadRequest
+
+# Force Join Channels
+FORCE_JOIN_CHANNELS = ["@cinepulsebot_official", "@modflux_99"]
+
+# ✅ Membership cache settings (seconds / entries)
+JOINED_TTL = float(os.getenv("FORCE_JOIN_JOINED_TTL", "600"))
+NOT_JOINED_TTL = float(os.getenv("FORCE_JOIN_NOT_JOINED_TTL", "30"))
+CACHE_SIZE = int(os.getenv("FORCE_JOIN_CACHE_SIZE", "50000"))
+
+# ✅ Probe settings: per-call timeout, breaker threshold/cooldown, and what to
+# do while the Bot API is failing: "closed" = lock users out, "open" = let them in
+PROBE_TIMEOUT = float(os.getenv("FORCE_JOIN_TIMEOUT", "3"))
+BREAKER_THRESHOLD = int(os.getenv("FORCE_JOIN_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("FORCE_JOIN_BREAKER_COOLDOWN", "30"))
+FAIL_MODE = os.getenv("FORCE_JOIN_FAIL_MODE", "closed")
+
+JOINED_STATUSES = {ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}
+
+# ✅ user_id → (expires_at, missing channels), LRU-evicted past max_size.
+# "Joined" verdicts live longer than "not joined" so a user who just joined
+# is re-checked quickly while members cost no API calls for a while.
+class MembershipCache:
+    def __init__(self, joined_ttl=JOINED_TTL, not_joined_ttl=NOT_JOINED_TTL, max_size=CACHE_SIZE):
+        self.joined_ttl = joined_ttl
+        self.not_joined_ttl = not_joined_ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, missing = entry
+        if expires_at < time.monotonic():
+            del self.entries[user_id]
+            return None
+        self.entries.move_to_end(user_id)
+        return missing
+
+    def put(self, user_id, missing):
+        ttl = self.not_joined_ttl if missing else self.joined_ttl
+        self.entries[user_id] = (time.monotonic() + ttl, tuple(missing))
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        self.entries.pop(user_id, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+membership_cache = MembershipCache()
+
+# ✅ Trips after `threshold` consecutive API failures and stays open for
+# `cooldown` seconds; then one probe is let through (half-open) to test it,
+# and everyone else keeps short-circuiting until that trial succeeds or fails.
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    # Trial finished without a verdict (e.g. cancelled) → let the next caller try
+    def release(self):
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.trial_in_flight = False
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+breaker = CircuitBreaker()
+
+# ✅ Latency / outcome counters for get_chat_member probes
+probe_stats = {
+    "probes": 0,
+    "errors": 0,
+    "timeouts": 0,
+    "short_circuited": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+}
+
+def get_probe_stats():
+    stats = dict(probe_stats)
+    done = stats["probes"] or 1
+    stats["avg_ms"] = round(stats["total_ms"] / done, 1)
+    stats["breaker"] = breaker.state
+    return stats
+
+# One channel → True (joined), False (not joined) or None (API failure)
+async def _probe(bot, ch, user_id):
+    started = time.perf_counter()
+    try:
+        member = await asyncio.wait_for(bot.get_chat_member(ch, user_id), PROBE_TIMEOUT)
+        breaker.record_success()
+        return member.status in JOINED_STATUSES
+    except BadRequest:
+        # e.g. "user not found" → a real answer from Telegram, not an outage
+        breaker.record_success()
+        return False
+    except asyncio.TimeoutError:
+        probe_stats["timeouts"] += 1
+        logging.warning(f"Join check timed out for {ch}")
+    except Exception as e:
+        probe_stats["errors"] += 1
+        logging.warning(f"Join check failed for {ch}: {e}")
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        probe_stats["probes"] += 1
+        probe_stats["total_ms"] += elapsed
+        probe_stats["max_ms"] = max(probe_stats["max_ms"], elapsed)
+    breaker.record_failure()
+    return None
+
+# ✅ Ask Telegram which required channels the user has not joined.
+# All channels are probed concurrently, so latency is the slowest probe,
+# not the sum. Returns (missing, reliable) — unreliable answers aren't cached.
+async def probe_channels(bot, user_id):
+    fail_missing = FAIL_MODE != "open"
+    if not breaker.allow():
+        probe_stats["short_circuited"] += 1
+        return (list(FORCE_JOIN_CHANNELS) if fail_missing else []), False
+
+    try:
+        results = await asyncio.gather(*(_probe(bot, ch, user_id) for ch in FORCE_JOIN_CHANNELS))
+    finally:
+        breaker.release()
+    missing = [
+        ch for ch, joined in zip(FORCE_JOIN_CHANNELS, results)
+        if joined is False or (joined is None and fail_missing)
+    ]
+    return missing, None not in results
+
+# ✅ Cached lookup; fresh=True skips (and replaces) the cached verdict
+async def get_missing_channels(bot, user_id, fresh=False):
+    if fresh:
+        membership_cache.invalidate(user_id)
+    else:
+        missing = membership_cache.get(user_id)
+        if missing is not None:
+            return list(missing)
+    missing, reliable = await probe_channels(bot, user_id)
+    if reliable:
+        membership_cache.put(user_id, missing)
+    return missing
@@ -0,0 +1,124 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+# ✅ Resolver settings (API base is overridable → point it at a local stand-in server in tests)
+API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+NAME_TIMEOUT = float(os.getenv("NAME_LOOKUP_TIMEOUT", "5"))
+NAME_TTL = float(os.getenv("NAME_CACHE_TTL", "3600"))
+NAME_CACHE_SIZE = int(os.getenv("NAME_CACHE_SIZE", "10000"))
+NAME_MAX_CONNECTIONS = int(os.getenv("NAME_MAX_CONNECTIONS", "20"))
+
+# ✅ Display name from a getChat result
+def format_name(chat, user_id, prefer_username=False):
+    chat = chat or {}
+    full_name = f"{chat.get('first_name', '')} {chat.get('last_name', '')}".strip()
+    username = f"@{chat['username']}" if chat.get("username") else ""
+    if prefer_username:
+        return username or full_name or f"User {user_id}"
+    return full_name or username or f"User {user_id}"
+
+# ✅ Async getChat lookups: one pooled HTTP client, LRU+TTL cache, and
+# concurrent lookups of the same id share a single request.
+class NameResolver:
+    def __init__(self, token=BOT_TOKEN, api_base=API_BASE, timeout=NAME_TIMEOUT,
+                 ttl=NAME_TTL, max_size=NAME_CACHE_SIZE):
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache = OrderedDict()  # user_id → (expires_at, chat or None)
+        self.pending = {}           # user_id → Future shared by duplicate lookups
+        self.client = None
+
+    def _client(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=NAME_MAX_CONNECTIONS),
+            )
+        return self.client
+
+    # Cache-only peek: never does I/O (safe from sync code)
+    def cached(self, user_id):
+        entry = self.cache.get(str(user_id))
+        if entry and entry[0] >= time.monotonic():
+            return entry[1]
+        return None
+
+    def _remember(self, user_id, chat):
+        self.cache[user_id] = (time.monotonic() + self.ttl, chat)
+        self.cache.move_to_end(user_id)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    async def _fetch(self, user_id):
+        url = f"{self.api_base}/bot{self.token}/getChat"
+        try:
+            response = await self._client().get(url, params={"chat_id": user_id})
+            data = response.json()
+        except Exception as e:
+            logging.warning(f"Name lookup failed for {user_id}: {e}")
+            return None
+        if data.get("ok"):
+            return data["result"]
+        # Only a definite "chat not found" is worth caching; flood waits (429),
+        # 5xx and anything else are retried on the next lookup
+        if data.get("error_code") == 400 and "chat not found" in data.get("description", "").lower():
+            return {}
+        logging.warning(f"Name lookup failed for {user_id}: {data.get('error_code')} {data.get('description')}")
+        return None
+
+    # ✅ getChat result (dict) for a user, {} if the chat doesn't exist, None on error (not cached)
+    async def get_chat(self, user_id):
+        user_id = str(user_id)
+        entry = self.cache.get(user_id)
+        if entry and entry[0] >= time.monotonic():
+            self.cache.move_to_end(user_id)
+            return entry[1]
+
+        future = self.pending.get(user_id)
+        if future is not None:
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[user_id] = future
+        try:
+            chat = await self._fetch(user_id)
+            if chat is not None:
+                self._remember(user_id, chat)
+            future.set_result(chat)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self.pending[user_id]
+        return chat
+
+    async def resolve(self, user_id, prefer_username=False):
+        return format_name(await self.get_chat(user_id), user_id, prefer_username)
+
+    # ✅ Names for many ids, at most `concurrency` getChat calls in flight
+    async def resolve_many(self, user_ids, concurrency=10, prefer_username=False):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(user_id):
+            async with semaphore:
+                return await self.resolve(user_id, prefer_username)
+
+        return await asyncio.gather(*(one(uid) for uid in user_ids))
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+name_resolver = NameResolver()
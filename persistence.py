@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from telegram.ext import BasePersistence, PersistenceInput
+from categories import CATEGORIES, ACTIVE_KEY
+
+# ✅ Pagination state survives restarts (SQLite WAL, one row per browsing user)
+STATE_DB = os.getenv("USER_STATE_DB", "logs/user_state.db")
+STATE_TTL = int(os.getenv("USER_STATE_TTL", str(48 * 3600)))  # idle users are forgotten after this
+PERSIST_INTERVAL = 10    # seconds between PTB persistence runs
+COMMIT_DELAY = 1.0       # changes within this window share one transaction
+EVICT_EVERY = 600        # seconds between idle-user sweeps
+TOUCH_FRACTION = 8       # an active user's row is re-stamped every ttl / this
+
+# Only what a restart would break: the category being browsed and its page
+STATE_KEYS = frozenset({ACTIVE_KEY, *(category.page_key for category in CATEGORIES.values())})
+
+# ✅ user_data → compact JSON of the state keys ("" = nothing worth storing)
+def encode_state(user_data):
+    state = {key: user_data[key] for key in sorted(STATE_KEYS & user_data.keys())}
+    return json.dumps(state, separators=(",", ":")) if state else ""
+
+# ✅ user_data-only persistence that writes deltas, not the whole blob.
+# PTB hands over the users touched since the last run; users whose encoded
+# state is unchanged are skipped, the rest are buffered and written together
+# in a single transaction off the event loop. `updated` is the last activity:
+# users who keep browsing without changing state get their row re-stamped
+# every ttl / TOUCH_FRACTION, so the startup purge doesn't drop them.
+class PaginationPersistence(BasePersistence):
+    def __init__(self, path=STATE_DB, ttl=STATE_TTL, update_interval=PERSIST_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.touch_every = ttl / TOUCH_FRACTION
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_state ("
+            "user_id INTEGER PRIMARY KEY, state TEXT NOT NULL, updated INTEGER NOT NULL)"
+        )
+        self.saved = {}   # user_id → state as stored
+        self.dirty = {}   # user_id → state to write ("" = delete row)
+        self.touch = set()  # unchanged users whose row needs a fresh timestamp
+        self.stamped = {}   # user_id → `updated` as stored
+        self.seen = {}    # user_id → last activity (for idle eviction)
+        self.commit_task = None
+        self.task = None
+        self.commits = 0
+        self.rows_written = 0
+
+    # ✅ Startup: expired rows are purged, the rest become Application.user_data
+    async def get_user_data(self):
+        cutoff = int(time.time()) - self.ttl
+        with self.lock:
+            self.conn.execute("DELETE FROM user_state WHERE updated < ?", (cutoff,))
+            rows = self.conn.execute("SELECT user_id, state, updated FROM user_state").fetchall()
+        data = {}
+        for user_id, state, updated in rows:
+            data[user_id] = json.loads(state)
+            self.saved[user_id] = state
+            self.stamped[user_id] = updated
+            self.seen[user_id] = updated
+        return data
+
+    async def update_user_data(self, user_id, data):
+        now = self.seen[user_id] = time.time()
+        state = encode_state(data)
+        if state == self.saved.get(user_id, ""):
+            self.dirty.pop(user_id, None)
+            if state and now - self.stamped.get(user_id, 0) >= self.touch_every:
+                self.touch.add(user_id)
+                self.schedule_commit()
+            return
+        self.dirty[user_id] = state
+        self.schedule_commit()
+
+    async def drop_user_data(self, user_id):
+        self.seen.pop(user_id, None)
+        self.touch.discard(user_id)
+        if user_id in self.saved or user_id in self.dirty:
+            self.dirty[user_id] = ""
+            self.schedule_commit()
+
+    # ✅ Group commit: the first change arms a short timer, everything that
+    # arrives before it fires goes into the same transaction
+    def schedule_commit(self):
+        if self.commit_task is None or self.commit_task.done():
+            self.commit_task = asyncio.get_running_loop().create_task(self.commit_later())
+
+    async def commit_later(self):
+        await asyncio.sleep(COMMIT_DELAY)
+        await self.commit()
+
+    async def commit(self):
+        batch, self.dirty = self.dirty, {}
+        touch, self.touch = self.touch - batch.keys(), set()
+        if not batch and not touch:
+            return
+        now = int(time.time())
+        try:
+            await asyncio.to_thread(self.write, batch, touch, now)
+        except Exception as e:
+            print(f"[❌] Saving user state failed: {e}")
+            for user_id, state in batch.items():
+                self.dirty.setdefault(user_id, state)  # retried with the next commit
+            self.touch |= touch
+            return
+        for user_id, state in batch.items():
+            if state:
+                self.saved[user_id] = state
+                self.stamped[user_id] = now
+            else:
+                self.saved.pop(user_id, None)
+                self.stamped.pop(user_id, None)
+        for user_id in touch:
+            self.stamped[user_id] = now
+
+    def write(self, batch, touch=(), now=None):
+        now = int(time.time()) if now is None else now
+        upserts = [(user_id, state, now) for user_id, state in batch.items() if state]
+        deletes = [(user_id,) for user_id, state in batch.items() if not state]
+        stamps = [(now, user_id) for user_id in touch]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT INTO user_state (user_id, state, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                    upserts,
+                )
+                self.conn.executemany("DELETE FROM user_state WHERE user_id = ?", deletes)
+                self.conn.executemany("UPDATE user_state SET updated = ? WHERE user_id = ?", stamps)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        self.commits += 1
+        self.rows_written += len(batch) + len(stamps)
+
+    # ✅ Shutdown (called by Application.shutdown after the last persistence run)
+    async def flush(self):
+        if self.commit_task and not self.commit_task.done():
+            self.commit_task.cancel()
+        await self.commit()
+        with self.lock:
+            self.conn.close()
+
+    # ✅ Idle eviction: drop users inactive for a full TTL from Application.user_data;
+    # PTB then calls drop_user_data, which deletes their row on the next commit
+    def evict_idle(self, app, now=None):
+        cutoff = (time.time() if now is None else now) - self.ttl
+        idle = [user_id for user_id, seen in self.seen.items() if seen < cutoff]
+        for user_id in idle:
+            app.drop_user_data(user_id)
+            del self.seen[user_id]
+        return len(idle)
+
+    async def run(self, app):
+        while True:
+            await asyncio.sleep(EVICT_EVERY)
+            evicted = self.evict_idle(app)
+            if evicted:
+                print(f"🧹 Evicted {evicted} idle users' state")
+
+    def start(self, app):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run(app))
+        return self.task
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    # Not stored: bot/chat/callback data and conversations
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {}
+
+    async def update_conversation(self, name, key, new_state):
+        pass
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+state_persistence = PaginationPersistence()
@@ -0,0 +1,85 @@
+import os
+import json
+import threading
+from telegram.error import BadRequest
+
+# ✅ title → [poster url, Telegram file_id] for posters served from external URLs.
+# The first successful send uploads from the URL; every later send reuses the
+# file_id, so Telegram never has to fetch from ibb.co / catbox again.
+POSTER_CACHE_FILE = os.getenv("POSTER_CACHE_FILE", "logs/poster_file_ids.json")
+
+def is_url(poster):
+    return poster.startswith(("http://", "https://"))
+
+# ✅ Page URLs (ibb.co / catbox.moe) → direct image URLs; also the cache key,
+# so category and search sends share one entry per poster
+def fix_poster_url(url: str) -> str:
+    if not url:
+        return ""
+    if url.endswith((".jpg", ".jpeg", ".png", ".webp")) or "i.ibb.co" in url:
+        return url
+    if "ibb.co/" in url:
+        code = url.strip().split("/")[-1]
+        return f"https://i.ibb.co/{code}/poster.jpg"
+    if "catbox.moe" in url:
+        return url.replace("https://catbox.moe/", "https://files.catbox.moe/")
+    return url
+
+class PosterCache:
+    def __init__(self, path=POSTER_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[❌] Failed to load {path}: {e}")
+
+    # What to pass as photo= : cached file_id if this exact URL was sent before
+    def resolve(self, title, poster):
+        entry = self.entries.get(title)
+        if entry and entry[0] == poster:
+            return entry[1]
+        return poster
+
+    # Remember the file_id from a sent message (only for URL posters)
+    def remember(self, title, poster, message):
+        if not poster or not is_url(poster) or not getattr(message, "photo", None):
+            return
+        file_id = message.photo[-1].file_id
+        if self.entries.get(title) == [poster, file_id]:
+            return
+        self.entries[title] = [poster, file_id]
+        self.save()
+
+    def forget(self, title):
+        if self.entries.pop(title, None) is not None:
+            self.save()
+
+    # Atomic rewrite; only happens on the first send of each poster
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+poster_cache = PosterCache()
+
+# ✅ reply_photo through the cache; a stale file_id falls back to the URL once
+async def reply_poster(message, title, poster, **kwargs):
+    poster = fix_poster_url(poster)
+    photo = poster_cache.resolve(title, poster)
+    try:
+        sent = await message.reply_photo(photo=photo, **kwargs)
+    except BadRequest:
+        if photo == poster:
+            raise
+        poster_cache.forget(title)
+        sent = await message.reply_photo(photo=poster, **kwargs)
+    poster_cache.remember(title, poster, sent)
+    return sent
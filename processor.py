@@ -0,0 +1,124 @@
+import os
+import asyncio
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# ✅ Concurrent update handling settings
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "32"))  # handlers running at once
+UPDATE_BACKLOG = int(os.getenv("UPDATE_BACKLOG", "1024"))        # admitted (running + waiting)
+USER_BACKLOG = int(os.getenv("USER_BACKLOG", "8"))               # pending updates per user, extra are dropped
+
+# Updates of the same user share a lane; anything without a user/chat has none
+def lane_key(update):
+    if isinstance(update, Update):
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return update.effective_chat.id
+    return None
+
+# ✅ Different users run in parallel, one user's updates run strictly in order
+# (pagination state in user_data depends on it). A user waits for their own
+# lane *before* taking one of the UPDATE_CONCURRENCY slots, so a slow poster
+# upload only occupies one slot. Each user may have at most USER_BACKLOG
+# updates pending (queued for admission, waiting or running); a flood beyond
+# that is dropped instead of filling the shared UPDATE_BACKLOG.
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, concurrency=UPDATE_CONCURRENCY, backlog=UPDATE_BACKLOG,
+                 per_user=USER_BACKLOG, key=lane_key):
+        super().__init__(max(backlog, concurrency, 2))
+        self.concurrency = concurrency
+        self.per_user = per_user
+        self.key = key
+        self.slots = asyncio.Semaphore(concurrency)
+        self.lanes = {}    # key → [lock, updates using it]
+        self.pending = {}  # key → updates not finished yet (incl. not admitted)
+        self.queued = 0    # waiting for admission (backlog full)
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.running = 0
+        self.processed = 0
+        self.dropped = 0
+
+    # PTB's update fetcher hands every update over immediately; the ones that
+    # don't fit the backlog wait here on the admission semaphore, so this is
+    # where they're counted and where one user's share is capped
+    async def process_update(self, update, coroutine):
+        key = self.key(update)
+        if key is not None:
+            if self.pending.get(key, 0) >= self.per_user:
+                self.dropped += 1
+                coroutine.close()
+                return
+            self.pending[key] = self.pending.get(key, 0) + 1
+        self.queued += 1
+        admitted = False
+        try:
+            async with self._semaphore:
+                self.queued -= 1
+                admitted = True
+                await self.do_process_update(update, coroutine)
+        finally:
+            if not admitted:
+                self.queued -= 1
+                coroutine.close()  # cancelled before admission → never ran
+            if key is not None:
+                self.pending[key] -= 1
+                if not self.pending[key]:
+                    del self.pending[key]
+
+    async def do_process_update(self, update, coroutine):
+        key = self.key(update)
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        started = False
+        lane = None
+        try:
+            if key is not None:
+                lane = self.lanes.get(key)
+                if lane is None:
+                    lane = self.lanes[key] = [asyncio.Lock(), 0]
+                lane[1] += 1
+                await lane[0].acquire()
+            try:
+                async with self.slots:
+                    self.waiting -= 1
+                    self.running += 1
+                    started = True
+                    try:
+                        await coroutine
+                    finally:
+                        self.running -= 1
+                        self.processed += 1
+            finally:
+                if lane is not None:
+                    lane[0].release()
+        finally:
+            if not started:
+                self.waiting -= 1
+                coroutine.close()  # cancelled while queued → never ran
+            if lane is not None:
+                lane[1] -= 1
+                if not lane[1]:
+                    del self.lanes[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    # ✅ For the admin panel
+    def stats(self):
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "queued": self.queued,
+            "users": len(self.pending),
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "concurrency": self.concurrency,
+        }
+
+update_processor = PerUserUpdateProcessor()
@@ -1,9 +1,20 @@
-from difflib import get_close_matches
-from telegram import Update
-from telegram.ext import ContextTypes
 import os
-import json
+import heapq
+import math
+import asyncio
+from bisect import bisect_left
+from functools import lru_cache
+from telegram import (
+    Update, InlineQueryResultArticle, InlineQueryResultPhoto,
+    InlineQueryResultCachedPhoto, InputTextMessageContent, InlineQueryResultsButton,
+)
+from telegram.ext import ContextTypes
 from user_logger import handle_bot_block
+from security import check_flood
+from membership import get_missing_channels
+from utils import normalize_title
+from posters import reply_poster, poster_cache, is_url, fix_poster_url
+from categories import CATEGORIES_BY_FILE, get_category
 
 # ✅ JSON files to search in
 DATA_FILES = [
@@ -18,42 +29,17 @@ DATA_FILES = [
     "multipart_data.json",  
 ]
 
-# ✅ Convert poster URLs properly
-def fix_poster_url(url: str) -> str:
-    if not url:
-        return ""
-    if url.endswith((".jpg", ".jpeg", ".png", ".webp")) or "i.ibb.co" in url:
-        return url
-    if "ibb.co/" in url:
-        code = url.strip().split("/")[-1]
-        return f"https://i.ibb.co/{code}/poster.jpg"
-    if "catbox.moe" in url:
-        return url.replace("https://catbox.moe/", "https://files.catbox.moe/")
-    return url
-
-# ✅ Combine all data from all JSON files
+# ✅ Combine all data from the already-loaded categories (no extra JSON parsing)
 def load_all_data():
     all_data = {}
     for file in DATA_FILES:
-        if os.path.exists(file):
-            try:
-                with open(file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    all_data.update(data)
-            except Exception as e:
-                print(f"[❌] Failed to load {file}: {e}")
+        category = CATEGORIES_BY_FILE.get(file)
+        if category:
+            all_data.update(get_category(category.name).data)
     return all_data
 
-# ✅ Used in bot.py → search_movie(query)
-def search_movie(query):
-    data = load_all_data()
-    matches = get_close_matches(query, list(data.keys()), n=1, cutoff=0.3)
-
-    if not matches:
-        return None
-
-    title = matches[0]
-    item = data[title]
+# ✅ Search-format reply for one item → (poster url, caption ≤ 1024 chars)
+def render_result(title, item):
     poster = fix_poster_url(item.get("poster", ""))
     audio = item.get("audio", "Hindi + English")
     imdb = item.get("imdb", "N/A")
@@ -71,7 +57,129 @@ def search_movie(query):
         body = links[:allowed_links] + "\n🔗 More links available..."
         total = base + body + footer
 
-    return title, poster, total
+    return poster, total
+
+# ✅ Fuzzy search settings
+SEARCH_CUTOFF = 0.3   # minimum Dice similarity (0..1)
+SEARCH_LIMIT = 5      # how many candidates search_titles returns
+
+# ✅ Character trigrams of a padded string ("ab" → "  a", " ab", "ab ")
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# ✅ Prebuilt in-memory index → no file I/O on the search path
+# Titles are split into trigrams once; a query only touches the titles that
+# share at least one trigram with it (inverted index), not the whole catalog.
+class SearchIndex:
+    def __init__(self, data):
+        self.data = data
+        self.titles = list(data.keys())
+        self.by_key = {}
+        self.gram_counts = []
+        self.postings = {}
+        for i, title in enumerate(self.titles):
+            key = normalize_title(title)
+            self.by_key.setdefault(key, title)
+            grams = trigrams(key)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+        # Replies are rendered once here, so a search hit just sends them
+        self.rendered = {title: render_result(title, item) for title, item in data.items()}
+        self.search = lru_cache(maxsize=1024)(self._search)
+
+    def __len__(self):
+        return len(self.titles)
+
+    # The memoized search wrapper can't be pickled (catalog snapshot) → rebuild it
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["search"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.search = lru_cache(maxsize=1024)(self._search)
+
+    # ✅ Top-k (title, score) pairs ranked by trigram Dice similarity
+    def _search(self, query, limit=SEARCH_LIMIT, cutoff=SEARCH_CUTOFF):
+        key = normalize_title(query)
+        if not key:
+            return ()
+        exact = self.by_key.get(key)
+        if exact and limit == 1:
+            return ((exact, 1.0),)
+
+        # A title needs at least `need` shared trigrams to reach the cutoff, so
+        # only the rarest (total - need + 1) trigrams can introduce candidates;
+        # the common ones just top up titles that are already candidates.
+        postings = self.postings
+        grams = sorted(trigrams(key), key=lambda g: len(postings.get(g, ())))
+        total = len(grams)
+        need = max(1, math.ceil(cutoff * total / (2 - cutoff)))
+        seed = total - need + 1
+        shared = {}
+        for gram in grams[:seed]:
+            for i in postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        for gram in grams[seed:]:
+            posting = postings.get(gram, ())
+            if len(posting) <= len(shared):
+                for i in posting:
+                    if i in shared:
+                        shared[i] += 1
+            else:
+                for i in shared:
+                    pos = bisect_left(posting, i)
+                    if pos < len(posting) and posting[pos] == i:
+                        shared[i] += 1
+
+        counts = self.gram_counts
+        scored = []
+        for i, hits in shared.items():
+            score = 2 * hits / (total + counts[i])
+            if score >= cutoff:
+                scored.append((score, -i))
+        best = heapq.nlargest(limit, scored)
+        return tuple((self.titles[-i], round(score, 4)) for score, i in best)
+
+    def match(self, query):
+        results = self.search(query, 1)
+        return results[0][0] if results else None
+
+_search_index = None
+
+# ✅ Called once at startup from bot.py (and lazily on first search)
+def build_search_index():
+    global _search_index
+    _search_index = SearchIndex(load_all_data())
+    return _search_index
+
+# ✅ Swap in an index built elsewhere (e.g. by the catalog watcher)
+def set_search_index(index):
+    global _search_index
+    _search_index = index
+
+def get_search_index():
+    if _search_index is None:
+        return build_search_index()
+    return _search_index
+
+# ✅ Ranked candidates for a query → [(title, score), ...]
+def search_titles(query, limit=SEARCH_LIMIT, cutoff=SEARCH_CUTOFF):
+    return list(get_search_index().search(query, limit, cutoff))
+
+# ✅ Used in bot.py → search_movie(query)
+def search_movie(query):
+    index = get_search_index()
+    title = index.match(query)
+
+    if not title:
+        return None
+
+    poster, caption = index.rendered[title]
+    return title, poster, caption
 
 # ✅ When user types something to search
 async def search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -91,7 +199,7 @@ async def search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         if poster:
-            await update.message.reply_photo(photo=poster, caption=caption, parse_mode="HTML")
+            await reply_poster(update.message, title, poster, caption=caption, parse_mode="HTML")
         else:
             await update.message.reply_text(caption, parse_mode="HTML")
     except Exception as e:
@@ -101,3 +209,75 @@ async def search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             handle_bot_block(user_id)
 
         await update.message.reply_text(caption[:4000], parse_mode="HTML")
+
+
+# ✅ Inline mode: "@bot query" from any chat (enable inline mode in @BotFather).
+# Answers come straight from the prebuilt index and pre-rendered captions, and
+# posters already uploaded once are sent by file_id — no messages, no fetches.
+INLINE_MIN_CHARS = 2
+INLINE_PAGE_SIZE = 10
+INLINE_MAX_RESULTS = 50                                       # top-k, paged by offset
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))  # Telegram-side cache (s)
+INLINE_DEBOUNCE = float(os.getenv("INLINE_DEBOUNCE", "0.35"))   # wait for typing to settle
+
+# user id → id of their newest inline query (older ones are dropped)
+_latest_inline = {}
+
+# Shown instead of results to users who haven't joined the required channels;
+# opens the bot with /start join → the usual force-join prompt
+JOIN_BUTTON = InlineQueryResultsButton("🔒 Join our channels to search", start_parameter="join")
+
+def inline_result(result_id, title):
+    poster, caption = get_search_index().rendered[title]
+    if poster:
+        photo = poster_cache.resolve(title, poster)
+        if not is_url(photo):
+            return InlineQueryResultCachedPhoto(
+                result_id, photo, title=title, caption=caption, parse_mode="HTML",
+            )
+        return InlineQueryResultPhoto(
+            result_id, photo_url=poster, thumbnail_url=poster,
+            title=title, caption=caption, parse_mode="HTML",
+        )
+    return InlineQueryResultArticle(
+        result_id, title, InputTextMessageContent(caption, parse_mode="HTML"),
+    )
+
+# Register with block=False so a newer keystroke can arrive while this one waits
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    inline_query = update.inline_query
+    query = inline_query.query.strip()
+    if len(query) < INLINE_MIN_CHARS:
+        await inline_query.answer([], cache_time=INLINE_CACHE_TIME)
+        return
+
+    # Debounce: Telegram sends a query per keystroke; only answer the last one
+    user_id = inline_query.from_user.id
+    offset = int(inline_query.offset or 0)
+    if not offset:
+        _latest_inline[user_id] = inline_query.id
+        await asyncio.sleep(INLINE_DEBOUNCE)
+        if _latest_inline.get(user_id) != inline_query.id:
+            return
+        del _latest_inline[user_id]
+        if not check_flood(user_id, "inline"):
+            return
+
+    # Force-join applies here too (cached verdict, probed once per TTL)
+    if await get_missing_channels(context.bot, user_id):
+        await inline_query.answer([], cache_time=0, is_personal=True, button=JOIN_BUTTON)
+        return
+
+    ranked = get_search_index().search(query, INLINE_MAX_RESULTS, SEARCH_CUTOFF)
+    page = ranked[offset:offset + INLINE_PAGE_SIZE]
+    next_offset = offset + INLINE_PAGE_SIZE
+    results = [inline_result(str(n), title) for n, (title, _) in enumerate(page, offset)]
+    try:
+        await inline_query.answer(
+            results,
+            cache_time=INLINE_CACHE_TIME,
+            is_personal=True,  # a shared cache would hand results to non-members
+            next_offset=str(next_offset) if next_offset < len(ranked) else "",
+        )
+    except Exception as e:
+        print(f"[❗] Inline search error: {e}")
@@ -1,18 +1,78 @@
 import time
-import os
-import requests
+from collections import OrderedDict
 from user_logger import log_user, is_banned, handle_bot_block
 
 BOT_OWNER_ID = 7298989448  # Replace with your real Telegram user ID
 
-# Track user requests for DDoS detection
-user_request_log = {}
-
 # DDoS Settings
 DDOS_REQUEST_LIMIT = 100
 DDOS_TIME_WINDOW = 10  # seconds
 
-def is_user_allowed(update) -> bool:
+# ✅ Limits per scope (command / category): scope → (max requests, per seconds).
+# bot.rate_scope picks the scope: a command name ("start"), a category name
+# ("anime", "eighteen", ...), "search", "inline" or "callback".
+# "default" is the global DDoS bucket every update counts against; only going
+# over it earns a strike. Over a scoped limit the update is just dropped.
+RATE_LIMITS = {
+    "default": (DDOS_REQUEST_LIMIT, DDOS_TIME_WINDOW),
+    "start": (5, 60),
+    "search": (20, 60),      # every miss scores the whole index
+    "inline": (60, 60),      # settled queries, counted after the debounce
+    "callback": (30, 10),
+    "eighteen": (40, 60),
+}
+
+# ✅ Token bucket per (scope, user): two numbers per active user, nothing else.
+# Each scope keeps its buckets in an OrderedDict in last-used order; a bucket
+# idle for its scope's full window has refilled completely, so it is dropped —
+# it equals a fresh one. Short windows therefore stay small even when other
+# scopes use long ones.
+class RateLimiter:
+    def __init__(self, limits=RATE_LIMITS, clock=time.monotonic):
+        self.limits = limits
+        self.clock = clock
+        self.buckets = {scope: OrderedDict() for scope in limits}  # scope → user_id → [tokens, last_seen]
+
+    def hit(self, user_id, scope="default"):
+        if scope not in self.limits:
+            scope = "default"
+        capacity, per = self.limits[scope]
+        now = self.clock()
+        buckets = self.buckets[scope]
+        self._evict(buckets, per, now)
+
+        bucket = buckets.get(user_id)
+        if bucket is None:
+            bucket = buckets[user_id] = [capacity, now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * capacity / per)
+            bucket[1] = now
+            buckets.move_to_end(user_id)
+
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+    @staticmethod
+    def _evict(buckets, per, now):
+        while buckets:
+            user_id, (tokens, last) = next(iter(buckets.items()))
+            if now - last < per:
+                break
+            del buckets[user_id]
+
+    def evict_idle(self, now=None):
+        now = self.clock() if now is None else now
+        for scope, buckets in self.buckets.items():
+            self._evict(buckets, self.limits[scope][1], now)
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self.buckets.values())
+
+rate_limiter = RateLimiter()
+
+def is_user_allowed(update, scope: str = "default") -> bool:
     user_id = update.effective_user.id
 
     # Allow owner always
@@ -28,34 +88,20 @@ def is_user_allowed(update) -> bool:
     log_user(user_id)
 
     # Check flood/DDoS
+    return check_flood(user_id, scope)
+
+# ✅ Rate-limit check only (no ban lookup / logging) → False = flooding / over limit.
+# The global bucket decides about strikes; a scoped limit only drops the update.
+def check_flood(user_id: int, scope: str = "default") -> bool:
     if detect_ddos(user_id):
         handle_bot_block(user_id)
         print(f"🚨 DDoS detected from {user_id}")
         return False
-
+    if scope != "default" and user_id != BOT_OWNER_ID and not rate_limiter.hit(user_id, scope):
+        return False
     return True
 
-def detect_ddos(user_id: int) -> bool:
+def detect_ddos(user_id: int, scope: str = "default") -> bool:
     if user_id == BOT_OWNER_ID:
         return False
-
-    now = time.time()
-    requests = user_request_log.get(user_id, [])
-    requests = [t for t in requests if now - t < DDOS_TIME_WINDOW]
-    requests.append(now)
-    user_request_log[user_id] = requests
-
-    return len(requests) > DDOS_REQUEST_LIMIT
-
-# ✅ Get user name using Telegram API
-def get_user_name(user_id):
-    try:
-        r = requests.get(f"https://api.telegram.org/bot{os.getenv('BOT_TOKEN')}/getChat?chat_id={user_id}")
-        data = r.json()
-        if data.get("ok"):
-            user = data["result"]
-            full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-            return full_name or "Unknown"
-    except:
-        pass
-    return "Unknown"
\ No newline at end of file
+    return not rate_limiter.hit(user_id, scope)
@@ -0,0 +1,101 @@
+import os
+import pickle
+import hashlib
+import search
+import utils
+import posters
+import categories
+from categories import CATEGORIES, load_categories
+
+# ✅ One pickle with every category + prebuilt indexes → fast cold start
+SNAPSHOT_FILE = os.getenv("CATALOG_SNAPSHOT", "catalog.snapshot")
+SNAPSHOT_VERSION = 2
+
+# (mtime, size) of every source file, used to detect a stale snapshot
+def _fingerprint():
+    prints = {}
+    for category in CATEGORIES.values():
+        try:
+            st = os.stat(category.data_file)
+            prints[category.data_file] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            prints[category.data_file] = None
+    return prints
+
+# Hash of the code that renders captions / indexes (LINK_HELP, CATEGORY_REGISTRY,
+# Category.render, render_result, normalize_title, fix_poster_url …): a deploy that changes any
+# of it invalidates the snapshot even when no JSON file changed
+RENDER_MODULES = (categories, search, utils, posters)
+
+def _code_hash():
+    digest = hashlib.sha256()
+    for module in RENDER_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+# ✅ Compile the loaded catalog into SNAPSHOT_FILE (atomic replace).
+# Everything goes into a single pickle, so titles/items shared between the
+# category dicts, button indexes and search index are stored once.
+def build_snapshot(path=SNAPSHOT_FILE):
+    for category in CATEGORIES.values():
+        if category.data is None:
+            load_categories()
+            break
+
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "files": _fingerprint(),
+        "code": _code_hash(),
+        "categories": {
+            name: (category.data, (category.buttons, category.captions))
+            for name, category in CATEGORIES.items()
+        },
+        "search": search.get_search_index(),
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+# ✅ Load categories + search index from the snapshot.
+# Returns False (and changes nothing) when it is missing, unreadable or stale.
+def load_snapshot(path=SNAPSHOT_FILE):
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"[❌] Failed to read {path}: {e}")
+        return False
+
+    if (payload.get("version") != SNAPSHOT_VERSION or payload.get("files") != _fingerprint()
+            or payload.get("code") != _code_hash()):
+        print(f"[ℹ️] {path} is stale, loading JSON instead")
+        return False
+
+    for name, (data, indexes) in payload["categories"].items():
+        if name in CATEGORIES:
+            CATEGORIES[name].swap(data, indexes)
+    search.set_search_index(payload["search"])
+    return True
+
+# ✅ Startup: snapshot if fresh, otherwise JSON (and refresh the snapshot)
+def load_catalog(path=SNAPSHOT_FILE):
+    if load_snapshot(path):
+        return "snapshot"
+    load_categories()
+    search.build_search_index()
+    try:
+        build_snapshot(path)
+    except Exception as e:
+        print(f"[❗] Could not write {path}: {e}")
+    return "json"
+
+# ✅ Build step: python snapshot.py
+if __name__ == "__main__":
+    load_categories()
+    search.build_search_index()
+    print(f"✅ Wrote {build_snapshot()}")
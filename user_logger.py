@@ -1,55 +1,53 @@
 import os
-import requests
 from dotenv import load_dotenv
+from user_store import UserStore, BanList, StrikeLog
+from names import name_resolver, format_name
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 BOT_OWNER_ID = "7298989448"
 
-# 🔐 Ensure logs folder and required files exist
+# 🔐 Ensure logs folder exists
 os.makedirs("logs", exist_ok=True)
-for file in ["users.txt", "blocked.txt", "block_count.txt"]:
-    path = f"logs/{file}"
-    if not os.path.exists(path):
-        open(path, "a").close()
 
 USERS_FILE = "logs/users.txt"
 BLOCKED_FILE = "logs/blocked.txt"
 BLOCK_COUNT_FILE = "logs/block_count.txt"
 
+# 👥 Known users + bans live in SQLite now (old text files are imported once)
+user_store = UserStore()
+user_store.migrate_text_file(USERS_FILE)
+user_store.migrate_blocked_file(BLOCKED_FILE)
+banned_users = BanList(user_store)
+
+# ⚠️ Strike counts: in memory, journaled to block_count.txt
+strike_log = StrikeLog(BLOCK_COUNT_FILE)
+
 # ✅ Log a new user
 def log_user(user_id):
     user_id = str(user_id)
     if user_id == BOT_OWNER_ID:
         return
-    with open(USERS_FILE, "r+") as f:
-        users = f.read().splitlines()
-        if user_id not in users:
-            f.write(user_id + "\n")
+    user_store.add(user_id)
 
 # ✅ Check if user is banned
 def is_banned(user_id):
     user_id = str(user_id)
     if user_id == BOT_OWNER_ID:
         return False
-    with open(BLOCKED_FILE, "r") as f:
-        return user_id in f.read().splitlines()
+    return user_id in banned_users
+
+# ✅ Ban / unban (shared by admin, security and auto-block)
+def ban_user(user_id):
+    if str(user_id) == BOT_OWNER_ID:
+        return False
+    return banned_users.ban(user_id)
 
-# ✅ Get user’s display name using Telegram API
-def get_user_name(user_id):
-    try:
-        r = requests.get(f"https://api.telegram.org/bot{BOT_TOKEN}/getChat?chat_id={user_id}")
-        data = r.json()
-        if data.get("ok"):
-            user = data["result"]
-            name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-            if name:
-                return name
-            elif user.get("username"):
-                return f"@{user['username']}"
-    except Exception as e:
-        print(f"Error fetching user name for {user_id}: {e}")
-    return f"User {user_id}"
+def unban_user(user_id):
+    return banned_users.unban(user_id)
+
+def get_banned_users():
+    return [str(uid) for uid in banned_users]
 
 # ✅ Automatically block user after 3 warnings
 def handle_bot_block(user_id):
@@ -57,29 +55,14 @@ def handle_bot_block(user_id):
     if user_id == BOT_OWNER_ID:
         return False
 
-    counts = {}
-    with open(BLOCK_COUNT_FILE, "r+") as f:
-        lines = f.read().splitlines()
-        for line in lines:
-            if ":" in line:
-                uid, count = line.split(":")
-                counts[uid] = int(count)
-
-    current_count = counts.get(user_id, 0) + 1
-    counts[user_id] = current_count
-
-    with open(BLOCK_COUNT_FILE, "w") as f:
-        for uid, count in counts.items():
-            f.write(f"{uid}:{count}\n")
+    current_count = strike_log.add(user_id)
 
-    user_display = get_user_name(user_id)
+    # Cache-only: a warning must never wait on a getChat round-trip
+    user_display = format_name(name_resolver.cached(user_id), user_id)
 
     if current_count >= 3:
-        with open(BLOCKED_FILE, "r+") as f:
-            blocked = f.read().splitlines()
-            if user_id not in blocked:
-                f.write(user_id + "\n")
-                print(f"🚫 Blocked {user_display}")
+        if ban_user(user_id):
+            print(f"🚫 Blocked {user_display}")
         return True
 
     print(f"⚠️ Warning {user_display} - {current_count}/3")
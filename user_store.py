@@ -0,0 +1,284 @@
+import os
+import sqlite3
+import threading
+import time
+
+# ✅ SQLite user registry (WAL) — "seen this user?" is one primary-key lookup
+DB_FILE = os.getenv("USER_DB", "logs/users.db")
+LEGACY_USERS_FILE = "logs/users.txt"
+LEGACY_BLOCKED_FILE = "logs/blocked.txt"
+
+class UserStore:
+    def __init__(self, path=DB_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "user_id INTEGER PRIMARY KEY, first_seen INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS banned ("
+            "user_id INTEGER PRIMARY KEY, banned_at INTEGER NOT NULL)"
+        )
+        # ids confirmed in the table this run → repeat visitors cost no SQL at all
+        self.known = set()
+
+    # ✅ Returns True the first time a user is seen
+    def add(self, user_id):
+        user_id = int(user_id)
+        if user_id in self.known:
+            return False
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO users (user_id, first_seen) VALUES (?, ?)",
+                (user_id, int(time.time())),
+            )
+        self.known.add(user_id)
+        return cur.rowcount == 1
+
+    def __contains__(self, user_id):
+        user_id = int(user_id)
+        if user_id in self.known:
+            return True
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None
+
+    # ✅ Admin list views: "users" (everyone), "blocked", "unblocked"
+    _VIEWS = {
+        "users": "SELECT user_id FROM users",
+        "blocked": "SELECT user_id FROM banned",
+        "unblocked": "SELECT user_id FROM users WHERE user_id NOT IN (SELECT user_id FROM banned)",
+    }
+
+    def count(self, view="users"):
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM ({self._VIEWS[view]})").fetchone()[0]
+
+    # ✅ Stream user ids (primary-key order) without loading them all at once
+    # (after = resume point: only ids greater than it are yielded)
+    def iter_ids(self, batch=1000, after=-1):
+        last = after
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                    (last, batch),
+                ).fetchall()
+            if not rows:
+                return
+            for (user_id,) in rows:
+                yield user_id
+            last = rows[-1][0]
+
+    # ✅ One page of user ids (offset/limit) for admin views
+    def page(self, offset, limit, view="users"):
+        with self.lock:
+            rows = self.conn.execute(
+                f"{self._VIEWS[view]} ORDER BY user_id LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ✅ One-time import of the old logs/users.txt (file is kept as *.migrated)
+    def migrate_text_file(self, path=LEGACY_USERS_FILE):
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            ids = [int(line) for line in f.read().split() if line.isdigit()]
+        now = int(time.time())
+        with self.lock:
+            self.conn.execute("BEGIN")
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO users (user_id, first_seen) VALUES (?, ?)",
+                ((uid, now) for uid in ids),
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        os.replace(path, f"{path}.migrated")
+        print(f"📦 Migrated {added} users from {path}")
+        return added
+
+    def load_banned(self):
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT user_id FROM banned")}
+
+    def set_banned(self, user_id, banned):
+        with self.lock:
+            if banned:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO banned (user_id, banned_at) VALUES (?, ?)",
+                    (int(user_id), int(time.time())),
+                )
+            else:
+                self.conn.execute("DELETE FROM banned WHERE user_id = ?", (int(user_id),))
+
+    def migrate_blocked_file(self, path=LEGACY_BLOCKED_FILE):
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            ids = {int(line) for line in f.read().split() if line.isdigit()}
+        for uid in ids:
+            self.set_banned(uid, True)
+        os.replace(path, f"{path}.migrated")
+        print(f"📦 Migrated {len(ids)} banned users from {path}")
+        return len(ids)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# ✅ Banned ids kept in memory; every change is written through to SQLite.
+# is_banned() is then a set lookup with no I/O on the hot path.
+class BanList:
+    def __init__(self, store):
+        self.store = store
+        self.ids = store.load_banned()
+
+    def __contains__(self, user_id):
+        return int(user_id) in self.ids
+
+    def __iter__(self):
+        return iter(sorted(self.ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    # True if the user was not banned before
+    def ban(self, user_id):
+        user_id = int(user_id)
+        if user_id in self.ids:
+            return False
+        self.store.set_banned(user_id, True)
+        self.ids.add(user_id)
+        return True
+
+    # True if the user was banned before
+    def unban(self, user_id):
+        user_id = int(user_id)
+        if user_id not in self.ids:
+            return False
+        self.store.set_banned(user_id, False)
+        self.ids.discard(user_id)
+        return True
+
+
+# ✅ Strike counts in memory + append-only journal ("uid:count" per line, the
+# same format as the old block_count.txt; the last line for a uid wins).
+# A strike is one O(1) append; the journal is compacted into a fresh file
+# with an atomic rename once it holds far more lines than live users.
+# Appends are only flushed to the OS on the caller's thread (the event loop);
+# a background thread fsyncs once per `sync_window`, so a burst of strikes
+# shares one disk flush instead of each one stalling every user.
+class StrikeLog:
+    def __init__(self, path, compact_min=1000, fsync=True, sync_window=0.05):
+        self.path = path
+        self.compact_min = compact_min
+        self.fsync = fsync
+        self.sync_window = sync_window
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.lines = 0
+        torn = self._replay()
+        self.file = open(path, "a")
+        if torn:
+            self.file.write("\n")  # keep the next append on its own line
+        self.wake = threading.Condition()
+        self.unsynced = False
+        self.closed = False
+        self.syncer = None
+        if fsync:
+            self.syncer = threading.Thread(target=self._sync_loop, name="strike-log-fsync", daemon=True)
+            self.syncer.start()
+
+    # Load counts; True if the file ends mid-line (crash during an append)
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return False
+        line = ""
+        with open(self.path, "r") as f:
+            for line in f:
+                uid, sep, count = line.strip().partition(":")
+                if sep and count.isdigit():  # a torn last line is skipped
+                    self.counts[uid] = int(count)
+                    self.lines += 1
+        return bool(line) and not line.endswith("\n")
+
+    def _append(self, line):
+        self.file.write(line)
+        self.file.flush()
+        self.lines += 1
+        if self.fsync:
+            with self.wake:
+                self.unsynced = True
+                self.wake.notify()
+
+    # Group commit: wait for a first unsynced append, let the window fill, then
+    # fsync a dup of the fd outside the lock (a compaction may swap the file
+    # meanwhile; it fsyncs the new one itself)
+    def _sync_loop(self):
+        while True:
+            with self.wake:
+                while not self.unsynced and not self.closed:
+                    self.wake.wait()
+                if self.closed:
+                    return  # close() does the final fsync
+            time.sleep(self.sync_window)
+            with self.wake:
+                self.unsynced = False
+            self._sync()
+
+    def _sync(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            fd = os.dup(self.file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ✅ Record one strike → new count for the user
+    def add(self, user_id):
+        user_id = str(user_id)
+        with self.lock:
+            count = self.counts.get(user_id, 0) + 1
+            self.counts[user_id] = count
+            self._append(f"{user_id}:{count}\n")
+            if self.lines > max(self.compact_min, 2 * len(self.counts)):
+                self._compact()
+        return count
+
+    def get(self, user_id):
+        return self.counts.get(str(user_id), 0)
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            for uid, count in self.counts.items():
+                f.write(f"{uid}:{count}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(tmp, self.path)
+        self.file = open(self.path, "a")
+        self.lines = len(self.counts)
+
+    def close(self):
+        if self.syncer:
+            with self.wake:
+                self.closed = True
+                self.wake.notify()
+            self.syncer.join()
+            self._sync()
+        with self.lock:
+            self.file.close()
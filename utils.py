@@ -1,4 +1,7 @@
 import json
+import unicodedata
+from functools import lru_cache
+from itertools import islice
 from telegram import ReplyKeyboardMarkup, KeyboardButton
 
 # Link help note to add at the end of all content messages
@@ -14,6 +17,65 @@ def load_json(filename):
     with open(filename, "r", encoding="utf-8") as f:
         return json.load(f)
 
+# Unicode categories dropped from title keys: emoji/symbols, modifiers, ZWJ & co.
+_STRIP_CATEGORIES = {"So", "Sk", "Cf", "Cs", "Co", "Me"}
+
+# Canonical key for a title or button text:
+# NFKC (𝐀𝐧𝐢𝐦𝐞 → Anime) → drop emoji → collapse spaces → casefold
+@lru_cache(maxsize=4096)
+def normalize_title(text):
+    text = unicodedata.normalize("NFKC", text)
+    text = "".join(
+        ch for ch in text
+        if unicodedata.category(ch) not in _STRIP_CATEGORIES
+        and not "\ufe00" <= ch <= "\ufe0f"  # emoji variation selectors
+    )
+    return " ".join(text.split()).casefold()
+
+# Precompute {button text: (title, item)} once per dataset.
+# Normalized keys are added too, so typed titles still resolve in one lookup.
+def build_button_index(data):
+    buttons = {}
+    for title, item in data.items():
+        entry = (title, item)
+        buttons.setdefault(f"{title} {item.get('emoji', '')}".strip(), entry)
+    for title, item in data.items():
+        buttons.setdefault(normalize_title(title), (title, item))
+    return buttons
+
+# Resolve a pressed button → (title, item) or None
+def lookup_button(buttons, text):
+    return buttons.get(text) or buttons.get(normalize_title(text))
+
+# Category pages: 30 buttons per page, 2 per row
+ITEMS_PER_PAGE = 30
+
+def page_count(data):
+    return (len(data) - 1) // ITEMS_PER_PAGE + 1
+
+# One page keyboard; hide_dead_nav drops Back/Next on the first/last page
+def build_page_keyboard(data, page, hide_dead_nav=False):
+    start = (page - 1) * ITEMS_PER_PAGE
+    labels = [
+        f"{title} {item.get('emoji', '')}".strip()
+        for title, item in islice(data.items(), start, start + ITEMS_PER_PAGE)
+    ]
+    keyboard = [labels[i:i + 2] for i in range(0, len(labels), 2)]
+
+    if hide_dead_nav:
+        nav = []
+        if page > 1:
+            nav.append("⏮ Back")
+        if page < page_count(data):
+            nav.append("⏭ Next")
+        if nav:
+            keyboard.append(nav)
+    else:
+        keyboard.append(["⏮ Back", "⏭ Next"])
+    keyboard.append(["🏠 Main Menu"])
+
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
 # Format a detailed message for selected item (title, description, episodes)
 def format_item_message(title, description, episodes, quality):
     msg = f"<b>{title}</b>\n{description}\n\n"
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import search
+from categories import CATEGORIES
+from utils import load_json
+
+# ✅ How often catalog files are checked for changes (seconds)
+WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", "5"))
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+# ✅ Parse one file and build its indexes (runs in a worker thread)
+def _prepare(category):
+    data = load_json(category.data_file)
+    return data, category.build_indexes(data)
+
+# ✅ Polls *_data.json mtimes and hot-swaps only the categories that changed.
+# Parsing and index building happen off the event loop; the swap itself runs
+# on the loop, so handlers always see either the old or the new catalog.
+class CatalogWatcher:
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self.mtimes = {c.data_file: _mtime(c.data_file) for c in CATEGORIES.values()}
+        self.task = None
+
+    async def check(self):
+        reloaded = []
+        for category in CATEGORIES.values():
+            path = category.data_file
+            mtime = _mtime(path)
+            if mtime is None or mtime == self.mtimes.get(path):
+                continue
+            try:
+                data, indexes = await asyncio.to_thread(_prepare, category)
+            except Exception as e:
+                # Half-written file? Keep serving the old data and retry next poll
+                print(f"[❌] Reload failed for {path}: {e}")
+                continue
+            category.swap(data, indexes)
+            self.mtimes[path] = mtime
+            reloaded.append(category.name)
+            print(f"🔄 Reloaded {path}: {len(data)} titles")
+
+        if any(CATEGORIES[name].data_file in search.DATA_FILES for name in reloaded):
+            index = await asyncio.to_thread(search.SearchIndex, search.load_all_data())
+            search.set_search_index(index)
+        return reloaded
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"[❗] Catalog watcher error: {e}")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
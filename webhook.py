@@ -0,0 +1,176 @@
+import os
+import json
+import hmac
+import signal
+import asyncio
+import logging
+
+# ✅ How updates reach the bot: "polling" (default), "webhook" or "local".
+#   webhook → serve WEBHOOK_PATH and register WEBHOOK_URL with Telegram
+#   local   → same server on localhost, Telegram is never told about it;
+#             POST updates to it yourself (curl / tests) as a stand-in for Telegram
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")             # public https URL (load balancer)
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")       # required in webhook mode, shared by every instance
+WEBHOOK_IDLE_TIMEOUT = float(os.getenv("WEBHOOK_IDLE_TIMEOUT", "30"))      # seconds a read may stall
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "100"))  # open sockets at once
+MAX_BODY = 1 << 20
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+# ✅ Minimal embedded HTTP/1.1 server (stdlib asyncio, keep-alive).
+# Only accepts JSON POSTs on `path` carrying the secret token header, hands the
+# decoded update to `on_update` and answers 200 straight away; GET /healthz is
+# there for load balancer checks. Every read is bounded by `idle_timeout` and
+# at most `max_connections` sockets stay open, so idle or slow clients can't
+# pile up and exhaust file descriptors.
+class WebhookServer:
+    def __init__(self, on_update, path=WEBHOOK_PATH, secret=WEBHOOK_SECRET,
+                 listen=WEBHOOK_LISTEN, port=WEBHOOK_PORT,
+                 idle_timeout=WEBHOOK_IDLE_TIMEOUT, max_connections=WEBHOOK_MAX_CONNECTIONS):
+        self.on_update = on_update
+        self.path = path
+        self.secret = secret
+        self.listen = listen
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.server = None
+        self.connections = 0
+        self.rejected = 0
+        self.refused = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.listen, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # real port when port=0
+        return self
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        if self.connections >= self.max_connections:
+            self.refused += 1
+            try:
+                await self.respond(writer, 503, keep_alive=False)
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    return
+                request_line, *lines = head.decode("latin-1").split("\r\n")
+                method, target, version = request_line.split(" ", 2)
+                headers = {}
+                for line in lines:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, keep_alive=False)
+                    return
+                body = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout) if length else b""
+
+                status = await self.dispatch(method, target.split("?", 1)[0], headers, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self.respond(writer, status, keep_alive)
+                if not keep_alive:
+                    return
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, method, path, headers, body):
+        if path == "/healthz" and method == "GET":
+            return 200
+        if path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if self.secret and not hmac.compare_digest(headers.get(SECRET_HEADER, ""), self.secret):
+            self.rejected += 1
+            return 403
+        try:
+            await self.on_update(json.loads(body))
+        except Exception as e:
+            logging.error(f"Webhook rejected update: {e}")
+            return 400
+        return 200
+
+    async def respond(self, writer, status, keep_alive=True):
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Length: 0\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+        )
+        await asyncio.wait_for(writer.drain(), self.idle_timeout)
+
+# ✅ Webhook / local lifecycle for a python-telegram-bot Application.
+# Mirrors run_polling: initialize → post_init → start … stop → shutdown → post_shutdown.
+async def serve_webhook(app, local=False):
+    from telegram import Update
+
+    secret = WEBHOOK_SECRET
+    if not local and not WEBHOOK_URL:
+        raise SystemExit("❌ BOT_MODE=webhook needs WEBHOOK_URL (the public https URL)")
+    # Every instance behind the load balancer must check the same secret
+    if not local and not secret:
+        raise SystemExit("❌ BOT_MODE=webhook needs WEBHOOK_SECRET (same value on every instance)")
+
+    async def on_update(data):
+        await app.update_queue.put(Update.de_json(data, app.bot))
+
+    server = WebhookServer(on_update, secret=secret,
+                           listen="127.0.0.1" if local else WEBHOOK_LISTEN)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    try:
+        await app.start()
+        await server.start()
+        if not local:
+            await app.bot.set_webhook(WEBHOOK_URL, secret_token=secret, allowed_updates=Update.ALL_TYPES)
+        logging.info(f"Serving updates on {server.listen}:{server.port}{server.path} ({'local' if local else WEBHOOK_URL})")
+        await stop.wait()
+    finally:
+        await server.stop()
+        if app.running:
+            await app.stop()
+        if app.post_stop:
+            await app.post_stop(app)
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+# ✅ Called from bot.py → picks the delivery mode from BOT_MODE
+def run_bot(app, mode=BOT_MODE):
+    if mode == "polling":
+        app.run_polling()
+    elif mode in ("webhook", "local"):
+        asyncio.run(serve_webhook(app, local=mode == "local"))
+    else:
+        raise SystemExit(f"❌ Unknown BOT_MODE {mode!r} (polling / webhook / local)")